@@ -5,10 +5,11 @@ Handles shared state between agents and UI components
 
 import json
 import sqlite3
+import time
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
-import threading
+from contextlib import contextmanager
 import logging
 
 class StateManager:
@@ -16,7 +17,6 @@ class StateManager:
     
     def __init__(self, db_path: str = "vedops_state.db"):
         self.db_path = db_path
-        self.lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
         self._init_database()
         
@@ -25,9 +25,37 @@ class StateManager:
         self.agent_states = {}
         self.project_history = []
         
+        # Recent history served to dashboard reruns: (fetched_at, limit, rows)
+        self._history_snapshot = None
+    
+    @contextmanager
+    def _connection(self):
+        """Open an autocommit connection; single statements commit on their own"""
+        conn = sqlite3.connect(self.db_path, timeout=5.0, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+    
+    @contextmanager
+    def _write_transaction(self):
+        """Group several writes under one explicit BEGIN IMMEDIATE ... COMMIT"""
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        
     def _init_database(self):
         """Initialize SQLite database for persistence"""
-        with sqlite3.connect(self.db_path) as conn:
+        # Journal mode is persistent, so switching to WAL once is enough
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+        
+        with self._write_transaction() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS pipeline_runs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -71,51 +99,53 @@ class StateManager:
     
     def start_pipeline(self, project_name: str, metadata: Dict[str, Any]) -> int:
         """Start a new pipeline run"""
-        with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    INSERT INTO pipeline_runs (project_name, status, start_time, manifest)
-                    VALUES (?, ?, ?, ?)
-                """, (project_name, "running", datetime.now(), json.dumps(metadata)))
-                
-                pipeline_id = cursor.lastrowid
-                
-                self.current_pipeline = {
-                    'id': pipeline_id,
-                    'project_name': project_name,
-                    'status': 'running',
-                    'start_time': datetime.now(),
-                    'metadata': metadata,
-                    'current_step': 'varuna',
-                    'progress': 0
-                }
-                
-                return pipeline_id
+        with self._connection() as conn:
+            cursor = conn.execute("""
+                INSERT INTO pipeline_runs (project_name, status, start_time, manifest)
+                VALUES (?, ?, ?, ?)
+            """, (project_name, "running", datetime.now(), json.dumps(metadata)))
+            
+            pipeline_id = cursor.lastrowid
+        
+        self._history_snapshot = None
+        
+        # Rebinding the attribute is atomic, so readers never see a half-built dict
+        self.current_pipeline = {
+            'id': pipeline_id,
+            'project_name': project_name,
+            'status': 'running',
+            'start_time': datetime.now(),
+            'metadata': metadata,
+            'current_step': 'varuna',
+            'progress': 0
+        }
+        
+        return pipeline_id
     
     def update_pipeline_state(self, state: Any):
         """Update pipeline state from orchestrator"""
-        with self.lock:
-            if hasattr(state, 'pipeline_status'):
-                self.current_pipeline['status'] = state.pipeline_status.value
-                self.current_pipeline['current_step'] = state.current_step
-                
-                # Calculate progress based on current step
-                step_progress = {
-                    'varuna': 16,
-                    'agni': 32,
-                    'yama': 48,
-                    'vayu': 64,
-                    'hanuman': 80,
-                    'krishna': 95,
-                    'completed': 100
-                }
-                self.current_pipeline['progress'] = step_progress.get(state.current_step, 0)
+        if hasattr(state, 'pipeline_status'):
+            # Calculate progress based on current step
+            step_progress = {
+                'varuna': 16,
+                'agni': 32,
+                'yama': 48,
+                'vayu': 64,
+                'hanuman': 80,
+                'krishna': 95,
+                'completed': 100
+            }
+            self.current_pipeline.update({
+                'status': state.pipeline_status.value,
+                'current_step': state.current_step,
+                'progress': step_progress.get(state.current_step, 0)
+            })
     
     def log_agent_execution(self, pipeline_id: int, agent_name: str, 
                           status: str, input_data: Dict, output_data: Dict,
                           error_message: str = None, execution_time: float = 0):
         """Log agent execution details"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             conn.execute("""
                 INSERT INTO agent_logs 
                 (pipeline_id, agent_name, status, input_data, output_data, error_message, execution_time)
@@ -129,7 +159,7 @@ class StateManager:
     def save_artifact(self, pipeline_id: int, artifact_type: str, 
                      artifact_name: str, artifact_path: str, metadata: Dict = None):
         """Save pipeline artifact information"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             conn.execute("""
                 INSERT INTO project_artifacts 
                 (pipeline_id, artifact_type, artifact_name, artifact_path, metadata)
@@ -139,45 +169,86 @@ class StateManager:
                 artifact_path, json.dumps(metadata or {})
             ))
     
-    def get_pipeline_history(self, limit: int = 50) -> List[Dict]:
-        """Get recent pipeline execution history"""
-        with sqlite3.connect(self.db_path) as conn:
+    def _fetch_page(self, query: str, params: tuple) -> List[Dict]:
+        """Run a LIMITed query and return its rows as dicts
+        
+        The page is read in full before the connection closes, so no read
+        snapshot outlives the call.
+        """
+        with self._connection() as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM pipeline_runs 
-                ORDER BY created_at DESC 
-                LIMIT ?
-            """, (limit,))
-            
-            return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in conn.execute(query, params)]
     
-    def get_agent_logs(self, pipeline_id: int) -> List[Dict]:
-        """Get agent execution logs for a pipeline"""
-        with sqlite3.connect(self.db_path) as conn:
+    def get_pipeline_history(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        """Get recent pipeline execution history, one page at a time"""
+        return self._fetch_page("""
+            SELECT * FROM pipeline_runs 
+            ORDER BY created_at DESC 
+            LIMIT ? OFFSET ?
+        """, (limit, offset))
+    
+    def get_agent_logs(self, pipeline_id: int, offset: int = 0, 
+                      limit: int = 200) -> List[Dict]:
+        """Get agent execution logs for a pipeline, one page at a time"""
+        return self._fetch_page("""
+            SELECT * FROM agent_logs 
+            WHERE pipeline_id = ?
+            ORDER BY created_at ASC
+            LIMIT ? OFFSET ?
+        """, (pipeline_id, limit, offset))
+    
+    def find_completed_pipeline(self, content_sha256: str) -> Optional[Dict]:
+        """Find the latest completed pipeline run for an identical project upload"""
+        with self._connection() as conn:
             conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT * FROM agent_logs 
-                WHERE pipeline_id = ?
-                ORDER BY created_at ASC
-            """, (pipeline_id,))
+            row = conn.execute("""
+                SELECT id, results FROM pipeline_runs 
+                WHERE json_extract(manifest, '$.content_sha256') = ?
+                  AND status = 'completed' AND results IS NOT NULL
+                ORDER BY created_at DESC 
+                LIMIT 1
+            """, (content_sha256,)).fetchone()
             
-            return [dict(row) for row in cursor.fetchall()]
+        if not row:
+            return None
+        
+        return {'id': row['id'], 'results': json.loads(row['results'])}
     
     def get_current_pipeline(self) -> Dict:
         """Get current pipeline state"""
         return self.current_pipeline.copy()
     
+    def get_dashboard_snapshot(self, history_limit: int = 10, ttl: float = 5.0) -> Dict:
+        """Get everything the dashboard overview shows in one call
+        
+        The history query is reused for `ttl` seconds so that back-to-back
+        reruns do not hit SQLite again; pipeline writes invalidate it.
+        """
+        snapshot = self._history_snapshot
+        
+        if snapshot is None or snapshot[1] != history_limit or time.monotonic() - snapshot[0] > ttl:
+            snapshot = (time.monotonic(), history_limit, self.get_pipeline_history(limit=history_limit))
+            self._history_snapshot = snapshot
+        
+        return {
+            'current': self.get_current_pipeline(),
+            'history': snapshot[2]
+        }
+    
     def complete_pipeline(self, pipeline_id: int, results: Dict):
         """Mark pipeline as completed"""
-        with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute("""
-                    UPDATE pipeline_runs 
-                    SET status = ?, end_time = ?, results = ?
-                    WHERE id = ?
-                """, ("completed", datetime.now(), json.dumps(results), pipeline_id))
-                
-            if self.current_pipeline.get('id') == pipeline_id:
-                self.current_pipeline['status'] = 'completed'
-                self.current_pipeline['end_time'] = datetime.now()
-                self.current_pipeline['progress'] = 100
+        with self._connection() as conn:
+            conn.execute("""
+                UPDATE pipeline_runs 
+                SET status = ?, end_time = ?, results = ?
+                WHERE id = ?
+            """, ("completed", datetime.now(), json.dumps(results), pipeline_id))
+        
+        self._history_snapshot = None
+        
+        if self.current_pipeline.get('id') == pipeline_id:
+            self.current_pipeline.update({
+                'status': 'completed',
+                'end_time': datetime.now(),
+                'progress': 100
+            })
@@ -13,7 +13,6 @@ project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
 from ui.dashboard import render_dashboard
-from core.orchestrator import AgentOrchestrator
 from core.state_manager import StateManager
 from utils.config import load_config
 
@@ -35,8 +34,7 @@ def main():
     if 'state_manager' not in st.session_state:
         st.session_state.state_manager = StateManager()
     
-    if 'orchestrator' not in st.session_state:
-        st.session_state.orchestrator = AgentOrchestrator(st.session_state.state_manager)
+    # The agent orchestrator is built on demand when an analysis starts
     
     # Render main dashboard
     render_dashboard()
@@ -5,25 +5,21 @@ Displays Agni build progress and results
 
 import streamlit as st
 import json
+import os
 from pathlib import Path
-import plotly.graph_objects as go
 
 def render_build_status():
     """Render build status and results"""
     
     st.subheader("🔥 Build & Containerization Status")
     
-    # Check if we have build artifacts
-    artifacts_dir = Path("artifacts")
-    build_files = list(artifacts_dir.glob("build_artifacts_*.json"))
+    # Find the latest build artifacts
+    latest_build = find_latest_build_file(Path("artifacts"))
     
-    if not build_files:
+    if not latest_build:
         st.info("No build artifacts found. Run a project analysis first.")
         return
     
-    # Load latest build artifacts
-    latest_build = max(build_files, key=lambda x: x.stat().st_mtime)
-    
     with open(latest_build, 'r') as f:
         build_data = json.load(f)
     
@@ -75,6 +71,26 @@ def render_build_status():
     with tab4:
         render_optimization_notes(build_data)
 
+def find_latest_build_file(artifacts_dir: Path):
+    """Return the most recently modified build_artifacts_*.json, or None"""
+    latest_path = None
+    latest_mtime = -1.0
+    
+    try:
+        # DirEntry caches stat results, so each file costs a single syscall
+        with os.scandir(artifacts_dir) as entries:
+            for entry in entries:
+                if not (entry.name.startswith("build_artifacts_") and entry.name.endswith(".json")):
+                    continue
+                
+                mtime = entry.stat().st_mtime
+                if mtime > latest_mtime:
+                    latest_path, latest_mtime = entry.path, mtime
+    except FileNotFoundError:
+        return None
+    
+    return Path(latest_path) if latest_path else None
+
 def render_build_overview(build_data: dict):
     """Render build overview"""
     
@@ -257,6 +273,8 @@ def render_optimization_notes(build_data: dict):
     
     # Build metrics visualization
     if build_data.get('image_size', 0) > 0:
+        import plotly.graph_objects as go
+        
         st.subheader("📊 Build Metrics")
         
         # Create a simple metrics chart
@@ -5,6 +5,7 @@ Handles code ingestion UI for Varuna agent
 
 import streamlit as st
 import tempfile
+import hashlib
 import zipfile
 from pathlib import Path
 import asyncio
@@ -33,13 +34,17 @@ def render_project_upload():
         )
         
         if uploaded_file:
+            zip_bytes = uploaded_file.getvalue()
+            
             # Save uploaded file temporarily
             with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp_file:
-                tmp_file.write(uploaded_file.getvalue())
+                tmp_file.write(zip_bytes)
                 project_data = {
                     'source_type': 'zip',
                     'zip_path': tmp_file.name,
-                    'project_name': uploaded_file.name.replace('.zip', '')
+                    'project_name': uploaded_file.name.replace('.zip', ''),
+                    # Content hash identifies re-uploads of the same archive
+                    'content_sha256': hashlib.sha256(zip_bytes).hexdigest()
                 }
     
     elif upload_method == "Git Repository":
@@ -135,6 +140,15 @@ def render_project_upload():
 def start_analysis(project_data: dict):
     """Start the DevSecOps pipeline analysis"""
     
+    # Reuse the previous analysis when the exact same archive was uploaded before
+    content_sha256 = project_data.get('content_sha256')
+    if content_sha256:
+        previous_run = st.session_state.state_manager.find_completed_pipeline(content_sha256)
+        if previous_run:
+            st.info(f"♻️ This project was already analyzed in pipeline {previous_run['id']}. Showing cached results.")
+            display_analysis_results(previous_run['results'])
+            return
+    
     # Initialize progress tracking
     progress_placeholder = st.empty()
     status_placeholder = st.empty()
@@ -164,6 +178,11 @@ def start_analysis(project_data: dict):
             
             # Execute Varuna analysis
             try:
+                # Building the orchestrator imports every agent, so defer it to the first analysis
+                if 'orchestrator' not in st.session_state:
+                    from core.orchestrator import AgentOrchestrator
+                    st.session_state.orchestrator = AgentOrchestrator(st.session_state.state_manager)
+                
                 from agents.varuna import VarunaAgent
                 varuna = VarunaAgent()
                 
@@ -171,6 +190,7 @@ def start_analysis(project_data: dict):
                     result = varuna.execute(project_data)
                 
                 progress_bar.progress(100)
+                st.session_state.state_manager.complete_pipeline(pipeline_id, result)
                 
                 # Display results
                 display_analysis_results(result)
@@ -4,37 +4,85 @@ Displays Yama security scan results and compliance status
 """
 
 import streamlit as st
+import functools
+import html
 import json
+import os
+from collections import defaultdict
 import plotly.graph_objects as go
 import plotly.express as px
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # Optional: faster report parsing when available
+    orjson = None
+
+# Markdown hard line break used to fold detail fields into one element
+MD_LINE_BREAK = "  \n"
+
+# Display order for severities; unknown severities sort last
+SEVERITY_RANK = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+# Pie slice colors, looked up by label so they stay right when severities drop out
+SEVERITY_COLORS = {
+    'Critical': '#ff4444',
+    'High': '#ff8800',
+    'Medium': '#ffaa00',
+    'Low': '#44aa44'
+}
+
+# Columns shown in the vulnerabilities table
+VULNERABILITY_COLUMNS = ['Severity', 'Type', 'Tool', 'Title', 'File', 'Line']
+
+# Badge colors for compliance statuses; anything else is treated as non-compliant
+STATUS_COLORS = {
+    'Compliant': '#d4edda',
+    'Mostly Compliant': '#fff3cd',
+    'Partially Compliant': '#f8d7da'
+}
+DEFAULT_STATUS_COLOR = '#f5c6cb'
+
+BEST_PRACTICES = [
+    "Implement security scanning in your CI/CD pipeline",
+    "Regular security training for development team",
+    "Use infrastructure as code for consistent deployments",
+    "Implement proper logging and monitoring",
+    "Regular security audits and penetration testing",
+    "Keep all dependencies and base images up to date",
+    "Use least privilege principle for all access controls",
+    "Implement proper secret management practices"
+]
+
+# Rendered as a single block instead of one widget per practice
+BEST_PRACTICES_MD = "\n\n".join(f"🔒 {practice}" for practice in BEST_PRACTICES)
+
 def render_security_dashboard():
     """Render security assessment dashboard"""
     
     st.subheader("🛡️ Security & Compliance Dashboard")
     
-    # Check if we have security reports
-    artifacts_dir = Path("artifacts")
-    security_files = list(artifacts_dir.glob("security_report_*.json"))
+    # Locate latest security report
+    latest_report = find_latest_security_report("artifacts")
     
-    if not security_files:
+    if latest_report is None:
         st.info("No security reports found. Run a security scan first.")
         return
     
-    # Load latest security report
-    latest_report = max(security_files, key=lambda x: x.stat().st_mtime)
+    # DirEntry caches its stat result, so this does not touch the filesystem again
+    report_path, report_mtime = latest_report.path, latest_report.stat().st_mtime
     
-    with open(latest_report, 'r') as f:
-        security_data = json.load(f)
+    # Parsed once per run and handed to every tab; (report_path, report_mtime) keys the derived caches
+    security_data = load_security_report(report_path, report_mtime)
     
     # Security overview metrics
     render_security_overview(security_data)
     
     st.divider()
     
-    # Detailed tabs
+    # Detailed tabs; each tab body is a fragment, so its widgets rerun only that tab
     tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "🔍 Vulnerabilities", 
         "📦 Dependencies", 
@@ -44,19 +92,89 @@ def render_security_dashboard():
     ])
     
     with tab1:
-        render_vulnerabilities_tab(security_data)
+        render_vulnerabilities_tab(security_data, report_path, report_mtime)
     
     with tab2:
-        render_dependencies_tab(security_data)
+        render_dependencies_tab(security_data, report_path, report_mtime)
     
     with tab3:
-        render_container_security_tab(security_data)
+        render_container_security_tab(security_data, report_path, report_mtime)
     
     with tab4:
-        render_compliance_tab(security_data)
+        render_compliance_tab(security_data, report_path, report_mtime)
     
     with tab5:
-        render_recommendations_tab(security_data)
+        render_recommendations_tab(security_data, report_path, report_mtime)
+
+def find_latest_security_report(artifacts_dir: str):
+    """Return the DirEntry of the newest security_report_*.json, or None"""
+    try:
+        with os.scandir(artifacts_dir) as entries:
+            return max(
+                (e for e in entries if e.name.startswith("security_report_") and e.name.endswith(".json")),
+                key=lambda e: e.stat().st_mtime,
+                default=None
+            )
+    except FileNotFoundError:
+        return None
+
+# cache_resource hands back the parsed report itself rather than a copy; treat it as read-only
+@st.cache_resource(show_spinner=False, max_entries=4)
+def load_security_report(report_path: str, report_mtime: float) -> dict:
+    """Load and parse a security report; report_mtime keys the cache to the file version"""
+    if orjson is not None:
+        return orjson.loads(Path(report_path).read_bytes())
+    
+    with open(report_path, 'r') as f:
+        return json.load(f)
+
+@st.cache_data(show_spinner=False)
+def load_vulnerability_frame(report_path: str, report_mtime: float) -> pd.DataFrame:
+    """Tabulate a report's vulnerabilities, most severe first, for filtering and display
+    
+    The index holds each row's position in the report's vulnerabilities list.
+    """
+    vulnerabilities = load_security_report(report_path, report_mtime).get('vulnerabilities', [])
+    
+    frame = pd.DataFrame({
+        'severity': [str(v.get('severity', '')).lower() for v in vulnerabilities],
+        'type': [str(v.get('type', '')).lower() for v in vulnerabilities],
+        'tool': [v.get('tool', '') for v in vulnerabilities],
+        'Severity': [str(v.get('severity', 'unknown')).title() for v in vulnerabilities],
+        'Type': [str(v.get('type', 'unknown')).title() for v in vulnerabilities],
+        'Tool': [v.get('tool', 'Unknown') for v in vulnerabilities],
+        'Title': [v.get('title', 'Security Issue') for v in vulnerabilities],
+        'File': [v.get('file', '') for v in vulnerabilities],
+        'Line': [v.get('line') for v in vulnerabilities]
+    })
+    
+    # Order once per report so every view shows critical findings first
+    severity_rank = frame['severity'].map(SEVERITY_RANK).fillna(len(SEVERITY_RANK))
+    return frame.iloc[np.argsort(severity_rank.to_numpy(), kind='stable')]
+
+@st.cache_data(show_spinner=False)
+def load_container_vulnerabilities(report_path: str, report_mtime: float, limit: int = 10) -> list:
+    """Select the first container image vulnerabilities of a report via the cached frame"""
+    vulnerabilities = load_security_report(report_path, report_mtime).get('vulnerabilities', [])
+    frame = load_vulnerability_frame(report_path, report_mtime)
+    
+    matches = frame.index[frame['type'].to_numpy() == 'container'][:limit]
+    return [vulnerabilities[i] for i in matches]
+
+@st.cache_data(show_spinner=False)
+def load_tool_options(report_path: str, report_mtime: float) -> list:
+    """Collect the tool filter options for a report once per report version"""
+    vulnerabilities = load_security_report(report_path, report_mtime).get('vulnerabilities', [])
+    return ["All"] + sorted({v.get('tool', 'Unknown') for v in vulnerabilities}, key=str)
+
+@st.cache_data(show_spinner=False)
+def group_dependency_issues(report_path: str, report_mtime: float) -> dict:
+    """Group a report's dependency issues by package in a single pass"""
+    packages = defaultdict(list)
+    for issue in load_security_report(report_path, report_mtime).get('dependency_issues', []):
+        packages[issue.get('package', 'Unknown')].append(issue)
+    
+    return dict(packages)
 
 def render_security_overview(security_data: dict):
     """Render security overview metrics"""
@@ -121,33 +239,67 @@ def render_security_overview(security_data: dict):
     if summary.get('total_vulnerabilities', 0) > 0:
         st.subheader("📊 Vulnerability Distribution")
         
-        severity_data = {
-            'Critical': summary.get('critical_count', 0),
-            'High': summary.get('high_count', 0),
-            'Medium': summary.get('medium_count', 0),
-            'Low': summary.get('low_count', 0)
-        }
+        severities = nonzero_severity(
+            summary.get('critical_count', 0),
+            summary.get('high_count', 0),
+            summary.get('medium_count', 0),
+            summary.get('low_count', 0)
+        )
         
-        # Remove zero values
-        severity_data = {k: v for k, v in severity_data.items() if v > 0}
+        total = sum(count for _, count in severities)
+        top_severity, top_count = max(severities, key=lambda item: item[1], default=(None, 0))
         
-        if severity_data:
-            fig = go.Figure(data=[
-                go.Pie(
-                    labels=list(severity_data.keys()),
-                    values=list(severity_data.values()),
-                    marker_colors=['#ff4444', '#ff8800', '#ffaa00', '#44aa44']
-                )
-            ])
-            
-            fig.update_layout(
-                title="Vulnerabilities by Severity",
-                height=400
+        # A pie with one near-full slice says nothing a single metric cannot
+        if top_severity and top_count / total > 0.95:
+            st.metric(
+                "Dominant Severity",
+                top_severity,
+                delta=f"{100 * top_count / total:.0f}% of issues",
+                delta_color="off"
             )
+        elif severities:
+            fig = build_severity_pie(severities)
             
-            st.plotly_chart(fig, use_container_width=True)
+            # A stable key lets the frontend update the chart in place instead of remounting it;
+            # the pie is read-only, so skip Plotly's hover/event wiring and mode bar
+            st.plotly_chart(
+                fig,
+                use_container_width=True,
+                key="vuln_severity_pie",
+                config={'staticPlot': True, 'displayModeBar': False}
+            )
+
+@functools.lru_cache(maxsize=64)
+def nonzero_severity(critical: int, high: int, medium: int, low: int) -> tuple:
+    """Pair severity labels with their counts, dropping severities with no issues"""
+    return tuple(
+        (label, count)
+        for label, count in (('Critical', critical), ('High', high), ('Medium', medium), ('Low', low))
+        if count > 0
+    )
 
-def render_vulnerabilities_tab(security_data: dict):
+@st.cache_data(show_spinner=False)
+def build_severity_pie(severities: tuple) -> go.Figure:
+    """Build the vulnerability severity pie chart for (label, count) pairs"""
+    labels = [label for label, _ in severities]
+    
+    fig = go.Figure(data=[
+        go.Pie(
+            labels=labels,
+            values=[count for _, count in severities],
+            marker_colors=[SEVERITY_COLORS[label] for label in labels]
+        )
+    ])
+    
+    fig.update_layout(
+        title="Vulnerabilities by Severity",
+        height=400
+    )
+    
+    return fig
+
+@st.fragment
+def render_vulnerabilities_tab(security_data: dict, report_path: str, report_mtime: float):
     """Render vulnerabilities details"""
     
     vulnerabilities = security_data.get('vulnerabilities', [])
@@ -174,62 +326,83 @@ def render_vulnerabilities_tab(security_data: dict):
     with col3:
         tool_filter = st.selectbox(
             "Filter by Tool",
-            ["All"] + list(set(v.get('tool', 'Unknown') for v in vulnerabilities))
+            load_tool_options(report_path, report_mtime)
         )
     
-    # Apply filters
-    filtered_vulns = vulnerabilities
+    # Apply filters as boolean masks over the cached filter columns
+    frame = load_vulnerability_frame(report_path, report_mtime)
+    mask = np.ones(len(frame), dtype=bool)
     
     if severity_filter != "All":
-        filtered_vulns = [v for v in filtered_vulns if v.get('severity', '').lower() == severity_filter.lower()]
+        mask &= frame['severity'].to_numpy() == severity_filter.lower()
     
     if type_filter != "All":
-        filtered_vulns = [v for v in filtered_vulns if v.get('type', '').lower() == type_filter.lower()]
+        mask &= frame['type'].to_numpy() == type_filter.lower()
     
     if tool_filter != "All":
-        filtered_vulns = [v for v in filtered_vulns if v.get('tool', '') == tool_filter]
-    
-    st.write(f"**Showing {len(filtered_vulns)} of {len(vulnerabilities)} vulnerabilities**")
+        mask &= frame['tool'].to_numpy() == tool_filter
+    
+    matches = np.flatnonzero(mask)
+    shown = matches[:200]  # Limit table size for performance
+    
+    st.write(f"**Showing {len(matches)} of {len(vulnerabilities)} vulnerabilities**")
+    
+    # Display vulnerabilities as one table; selecting a row opens its details
+    selection = st.dataframe(
+        frame.iloc[shown][VULNERABILITY_COLUMNS],
+        use_container_width=True,
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+        # A new key per filter set and report drops a selection made against other rows
+        key=f"vulnerability_table:{report_mtime}:{severity_filter}:{type_filter}:{tool_filter}"
+    )
+    
+    selected_rows = selection.selection.rows
+    if not selected_rows or selected_rows[0] >= len(shown):
+        st.caption("Select a row to view vulnerability details")
+        return
     
-    # Display vulnerabilities
-    for i, vuln in enumerate(filtered_vulns[:20]):  # Limit to 20 for performance
-        with st.expander(f"🚨 {vuln.get('title', 'Security Issue')} ({vuln.get('severity', 'unknown').title()})"):
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.write(f"**Type:** {vuln.get('type', 'Unknown').title()}")
-                st.write(f"**Tool:** {vuln.get('tool', 'Unknown')}")
-                st.write(f"**Severity:** {vuln.get('severity', 'Unknown').title()}")
-                
-                if vuln.get('owasp_category'):
-                    st.write(f"**OWASP:** {vuln.get('owasp_category')}")
-                
-                if vuln.get('cwe'):
-                    st.write(f"**CWE:** {vuln.get('cwe')}")
-            
-            with col2:
-                if vuln.get('file'):
-                    st.write(f"**File:** {vuln.get('file')}")
-                
-                if vuln.get('line'):
-                    st.write(f"**Line:** {vuln.get('line')}")
-                
-                if vuln.get('package'):
-                    st.write(f"**Package:** {vuln.get('package')}")
-                
-                if vuln.get('fix_available'):
-                    st.success("✅ Fix Available")
-            
-            if vuln.get('description'):
-                st.write("**Description:**")
-                st.write(vuln.get('description'))
-            
-            if vuln.get('code'):
-                st.write("**Code:**")
-                st.code(vuln.get('code'), language='python')
+    vuln = vulnerabilities[frame.index[shown[selected_rows[0]]]]
+    with st.expander(f"🚨 {vuln.get('title', 'Security Issue')} ({vuln.get('severity', 'unknown').title()})", expanded=True):
+        
+        lines = [
+            f"**Type:** {vuln.get('type', 'Unknown').title()}",
+            f"**Tool:** {vuln.get('tool', 'Unknown')}",
+            f"**Severity:** {vuln.get('severity', 'Unknown').title()}"
+        ]
+        
+        if vuln.get('owasp_category'):
+            lines.append(f"**OWASP:** {vuln.get('owasp_category')}")
+        
+        if vuln.get('cwe'):
+            lines.append(f"**CWE:** {vuln.get('cwe')}")
+        
+        if vuln.get('file'):
+            lines.append(f"**File:** {vuln.get('file')}")
+        
+        if vuln.get('line'):
+            lines.append(f"**Line:** {vuln.get('line')}")
+        
+        if vuln.get('package'):
+            lines.append(f"**Package:** {vuln.get('package')}")
+        
+        if vuln.get('fix_available'):
+            lines.append("✅ **Fix Available**")
+        
+        if vuln.get('description'):
+            lines.append(f"**Description:**  \n{vuln.get('description')}")
+        
+        if vuln.get('code'):
+            lines.append("**Code:**")
+        
+        st.markdown(MD_LINE_BREAK.join(lines))
+        
+        if vuln.get('code'):
+            st.code(vuln.get('code'), language='python')
 
-def render_dependencies_tab(security_data: dict):
+@st.fragment
+def render_dependencies_tab(security_data: dict, report_path: str, report_mtime: float):
     """Render dependency security details"""
     
     dependency_issues = security_data.get('dependency_issues', [])
@@ -241,55 +414,49 @@ def render_dependencies_tab(security_data: dict):
     st.write(f"**Found {len(dependency_issues)} dependency issues**")
     
     # Group by package
-    packages = {}
-    for issue in dependency_issues:
-        pkg_name = issue.get('package', 'Unknown')
-        if pkg_name not in packages:
-            packages[pkg_name] = []
-        packages[pkg_name].append(issue)
+    packages = group_dependency_issues(report_path, report_mtime)
     
     # Display by package
     for package, issues in packages.items():
         with st.expander(f"📦 {package} ({len(issues)} issues)"):
             
             for issue in issues:
-                col1, col2 = st.columns(2)
+                lines = [
+                    f"**Current Version:** {issue.get('current_version', 'Unknown')}",
+                    f"**Severity:** {issue.get('severity', 'Unknown').title()}"
+                ]
                 
-                with col1:
-                    st.write(f"**Current Version:** {issue.get('current_version', 'Unknown')}")
-                    st.write(f"**Severity:** {issue.get('severity', 'Unknown').title()}")
-                    
-                    if issue.get('cve'):
-                        cves = issue.get('cve', [])
-                        if isinstance(cves, list):
-                            st.write(f"**CVEs:** {', '.join(cves)}")
-                        else:
-                            st.write(f"**CVE:** {cves}")
+                if issue.get('cve'):
+                    cves = issue.get('cve', [])
+                    if isinstance(cves, list):
+                        lines.append(f"**CVEs:** {', '.join(cves)}")
+                    else:
+                        lines.append(f"**CVE:** {cves}")
                 
-                with col2:
-                    if issue.get('patched_versions'):
-                        st.write(f"**Fixed In:** {issue.get('patched_versions')}")
-                        st.success("✅ Update Available")
-                    
-                    if issue.get('vulnerable_spec'):
-                        st.write(f"**Vulnerable:** {issue.get('vulnerable_spec')}")
+                if issue.get('patched_versions'):
+                    lines.append(f"**Fixed In:** {issue.get('patched_versions')} ✅ Update Available")
+                
+                if issue.get('vulnerable_spec'):
+                    lines.append(f"**Vulnerable:** {issue.get('vulnerable_spec')}")
                 
                 if issue.get('advisory'):
-                    st.write("**Advisory:**")
-                    st.write(issue.get('advisory'))
+                    lines.append(f"**Advisory:**  \n{issue.get('advisory')}")
+                
+                st.markdown(MD_LINE_BREAK.join(lines))
                 
                 if issue.get('recommendation'):
                     st.info(f"💡 **Recommendation:** {issue.get('recommendation')}")
                 
                 st.divider()
 
-def render_container_security_tab(security_data: dict):
+@st.fragment
+def render_container_security_tab(security_data: dict, report_path: str, report_mtime: float):
     """Render container security details"""
     
     container_security = security_data.get('container_security', {})
     
     # Container vulnerabilities
-    container_vulns = [v for v in security_data.get('vulnerabilities', []) if v.get('type') == 'container']
+    container_vulns = load_container_vulnerabilities(report_path, report_mtime)
     
     if container_vulns:
         st.subheader("🐳 Container Image Vulnerabilities")
@@ -309,26 +476,24 @@ def render_container_security_tab(security_data: dict):
                 st.metric("Fixable", analysis.get('fixable', 0))
         
         # Vulnerability list
-        for vuln in container_vulns[:10]:  # Limit display
+        for vuln in container_vulns:
             with st.expander(f"🔍 {vuln.get('vulnerability_id', 'Unknown')} - {vuln.get('package', 'Unknown')}"):
                 
-                col1, col2 = st.columns(2)
+                lines = [
+                    f"**Package:** {vuln.get('package', 'Unknown')}",
+                    f"**Installed:** {vuln.get('installed_version', 'Unknown')}",
+                    f"**Severity:** {vuln.get('severity', 'Unknown').title()}"
+                ]
                 
-                with col1:
-                    st.write(f"**Package:** {vuln.get('package', 'Unknown')}")
-                    st.write(f"**Installed:** {vuln.get('installed_version', 'Unknown')}")
-                    st.write(f"**Severity:** {vuln.get('severity', 'Unknown').title()}")
+                if vuln.get('fixed_version'):
+                    lines.append(f"**Fixed In:** {vuln.get('fixed_version')} ✅ Update Available")
                 
-                with col2:
-                    if vuln.get('fixed_version'):
-                        st.write(f"**Fixed In:** {vuln.get('fixed_version')}")
-                        st.success("✅ Update Available")
-                    
-                    st.write(f"**Target:** {vuln.get('target', 'Unknown')}")
+                lines.append(f"**Target:** {vuln.get('target', 'Unknown')}")
                 
                 if vuln.get('description'):
-                    st.write("**Description:**")
-                    st.write(vuln.get('description'))
+                    lines.append(f"**Description:**  \n{vuln.get('description')}")
+                
+                st.markdown(MD_LINE_BREAK.join(lines))
     
     # Dockerfile issues
     dockerfile_issues = container_security.get('dockerfile_issues', [])
@@ -351,7 +516,8 @@ def render_container_security_tab(security_data: dict):
     if not container_vulns and not dockerfile_issues:
         st.success("No container security issues found! 🎉")
 
-def render_compliance_tab(security_data: dict):
+@st.fragment
+def render_compliance_tab(security_data: dict, report_path: str, report_mtime: float):
     """Render compliance assessment"""
     
     compliance_status = security_data.get('compliance_status', {})
@@ -372,57 +538,79 @@ def render_compliance_tab(security_data: dict):
     # OWASP Top 10 compliance
     st.subheader("🔟 OWASP Top 10 Compliance")
     
-    owasp_status = compliance_status.get('owasp_top10', {})
-    
-    if owasp_status:
-        owasp_df = []
-        for category, details in owasp_status.items():
-            owasp_df.append({
-                'Category': category,
-                'Description': details.get('description', ''),
-                'Status': details.get('status', 'unknown').replace('_', ' ').title(),
-                'Score': details.get('score', 0),
-                'Issues': details.get('vulnerability_count', 0)
-            })
-        
-        df = pd.DataFrame(owasp_df)
-        
-        # Color code the status
-        def color_status(val):
-            if val == 'Compliant':
-                return 'background-color: #d4edda'
-            elif val == 'Mostly Compliant':
-                return 'background-color: #fff3cd'
-            elif val == 'Partially Compliant':
-                return 'background-color: #f8d7da'
-            else:
-                return 'background-color: #f5c6cb'
-        
-        styled_df = df.style.applymap(color_status, subset=['Status'])
-        st.dataframe(styled_df, use_container_width=True)
+    owasp_table = load_owasp_table(report_path, report_mtime)
+    
+    if owasp_table:
+        st.markdown(owasp_table, unsafe_allow_html=True)
     
     st.divider()
     
     # CIS Benchmarks compliance
     st.subheader("🛡️ CIS Benchmarks Compliance")
     
-    cis_status = compliance_status.get('cis_benchmarks', {})
-    
-    if cis_status:
-        cis_df = []
-        for category, details in cis_status.items():
-            cis_df.append({
-                'Category': category.replace('_', ' ').title(),
-                'Description': details.get('description', ''),
-                'Status': details.get('status', 'unknown').replace('_', ' ').title(),
-                'Score': details.get('score', 0)
-            })
-        
-        df = pd.DataFrame(cis_df)
-        styled_df = df.style.applymap(color_status, subset=['Status'])
-        st.dataframe(styled_df, use_container_width=True)
+    cis_table = load_cis_table(report_path, report_mtime)
+    
+    if cis_table:
+        st.markdown(cis_table, unsafe_allow_html=True)
 
-def render_recommendations_tab(security_data: dict):
+@st.cache_data(show_spinner=False)
+def load_owasp_table(report_path: str, report_mtime: float) -> str:
+    """Build the OWASP Top 10 compliance table for a report as HTML"""
+    compliance_status = load_security_report(report_path, report_mtime).get('compliance_status', {})
+    
+    return build_compliance_table([
+        {
+            'Category': category,
+            'Description': details.get('description', ''),
+            'Status': details.get('status', 'unknown').replace('_', ' ').title(),
+            'Score': details.get('score', 0),
+            'Issues': details.get('vulnerability_count', 0)
+        }
+        for category, details in compliance_status.get('owasp_top10', {}).items()
+    ])
+
+@st.cache_data(show_spinner=False)
+def load_cis_table(report_path: str, report_mtime: float) -> str:
+    """Build the CIS Benchmarks compliance table for a report as HTML"""
+    compliance_status = load_security_report(report_path, report_mtime).get('compliance_status', {})
+    
+    return build_compliance_table([
+        {
+            'Category': category.replace('_', ' ').title(),
+            'Description': details.get('description', ''),
+            'Status': details.get('status', 'unknown').replace('_', ' ').title(),
+            'Score': details.get('score', 0)
+        }
+        for category, details in compliance_status.get('cis_benchmarks', {}).items()
+    ])
+
+def status_badge(status: str) -> str:
+    """Render a compliance status as a colored badge span"""
+    color = STATUS_COLORS.get(status, DEFAULT_STATUS_COLOR)
+    return (
+        f"<span style='background-color: {color}; color: #212529; "
+        f"padding: 2px 8px; border-radius: 4px;'>{html.escape(status)}</span>"
+    )
+
+def build_compliance_table(rows: list) -> str:
+    """Render compliance rows as a plain HTML table; these have at most a dozen rows"""
+    if not rows:
+        return ""
+    
+    columns = list(rows[0])
+    header = "".join(f"<th>{column}</th>" for column in columns)
+    body = "".join(
+        "<tr>" + "".join(
+            f"<td>{status_badge(row[column]) if column == 'Status' else html.escape(str(row[column]))}</td>"
+            for column in columns
+        ) + "</tr>"
+        for row in rows
+    )
+    
+    return f"<table style='width: 100%;'><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table>"
+
+@st.fragment
+def render_recommendations_tab(security_data: dict, report_path: str, report_mtime: float):
     """Render security recommendations and auto-patches"""
     
     recommendations = security_data.get('recommendations', [])
@@ -440,33 +628,33 @@ def render_recommendations_tab(security_data: dict):
             if patch_type == 'dependency_update':
                 with st.expander(f"📦 Update {patch.get('package', 'Unknown')} ({patch.get('severity', 'medium').title()})"):
                     
-                    col1, col2 = st.columns(2)
+                    lines = [
+                        f"**Package:** {patch.get('package', 'Unknown')}",
+                        f"**Current:** {patch.get('current_version', 'Unknown')}",
+                        f"**Recommended:** {patch.get('recommended_version', 'Latest')}",
+                        f"**Severity:** {patch.get('severity', 'Medium').title()}",
+                        "✅ Auto-applicable" if patch.get('auto_applicable') else "⚠️ Manual review required"
+                    ]
                     
-                    with col1:
-                        st.write(f"**Package:** {patch.get('package', 'Unknown')}")
-                        st.write(f"**Current:** {patch.get('current_version', 'Unknown')}")
-                        st.write(f"**Recommended:** {patch.get('recommended_version', 'Latest')}")
+                    if patch.get('description'):
+                        lines.append(f"**Description:** {patch.get('description')}")
                     
-                    with col2:
-                        st.write(f"**Severity:** {patch.get('severity', 'Medium').title()}")
-                        if patch.get('auto_applicable'):
-                            st.success("✅ Auto-applicable")
-                        else:
-                            st.warning("⚠️ Manual review required")
+                    if patch.get('command'):
+                        lines.append("**Command:**")
+                    
+                    st.markdown(MD_LINE_BREAK.join(lines))
                     
                     if patch.get('command'):
-                        st.write("**Command:**")
                         st.code(patch.get('command'), language='bash')
-                    
-                    if patch.get('description'):
-                        st.write(f"**Description:** {patch.get('description')}")
             
             elif patch_type == 'configuration_fix':
                 with st.expander(f"⚙️ Fix {patch.get('issue', 'Configuration Issue')}"):
                     
-                    st.write(f"**File:** {patch.get('file', 'Unknown')}")
-                    st.write(f"**Line:** {patch.get('line', 0)}")
-                    st.write(f"**Issue:** {patch.get('issue', 'Unknown')}")
+                    st.markdown(MD_LINE_BREAK.join([
+                        f"**File:** {patch.get('file', 'Unknown')}",
+                        f"**Line:** {patch.get('line', 0)}",
+                        f"**Issue:** {patch.get('issue', 'Unknown')}"
+                    ]))
                     
                     if patch.get('recommendation'):
                         st.info(f"💡 **Recommendation:** {patch.get('recommendation')}")
@@ -483,17 +671,4 @@ def render_recommendations_tab(security_data: dict):
     
     # Security best practices
     st.subheader("📚 Security Best Practices")
-    
-    best_practices = [
-        "Implement security scanning in your CI/CD pipeline",
-        "Regular security training for development team",
-        "Use infrastructure as code for consistent deployments",
-        "Implement proper logging and monitoring",
-        "Regular security audits and penetration testing",
-        "Keep all dependencies and base images up to date",
-        "Use least privilege principle for all access controls",
-        "Implement proper secret management practices"
-    ]
-    
-    for practice in best_practices:
-        st.info(f"🔒 {practice}")
+    st.info(BEST_PRACTICES_MD)
@@ -4,6 +4,15 @@ Sidebar Navigation Component
 
 import streamlit as st
 
+SYSTEM_STATUS_MD = """
+### 🔧 System Status
+<span class="status-success">🟢 VedOps Online</span><br>
+<span class="status-running">🐳 Docker Available</span><br>
+<span class="status-running">🤖 Ollama Ready</span>
+
+### ⚡ Quick Actions
+"""
+
 def render_sidebar():
     """Render sidebar navigation"""
     
@@ -43,14 +52,8 @@ def render_sidebar():
         
         st.divider()
         
-        # System status
-        st.markdown("### 🔧 System Status")
-        st.success("🟢 VedOps Online")
-        st.info("🐳 Docker Available")
-        st.info("🤖 Ollama Ready")
-        
-        # Quick actions
-        st.markdown("### ⚡ Quick Actions")
+        # System status and quick actions header (static, one element)
+        st.markdown(SYSTEM_STATUS_MD, unsafe_allow_html=True)
         
         if st.button("🔄 Refresh Status", use_container_width=True):
             st.rerun()
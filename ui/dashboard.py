@@ -4,17 +4,115 @@ Renders the primary interface for VedOps platform
 """
 
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-from datetime import datetime, timedelta
-import asyncio
-import time
+import functools
+import numpy as np
+import pandas as pd
 
 from ui.components.sidebar import render_sidebar
-from ui.components.pipeline_view import render_pipeline_view
-from ui.components.agent_status import render_agent_status
-from ui.components.project_upload import render_project_upload
-from ui.components.reports_viewer import render_reports_viewer
+from utils.config import load_config
+
+# Settings page choices, built once at import instead of on every rerun
+CLOUD_PROVIDERS = ("AWS", "Azure", "GCP", "On-Premises")
+
+LOCAL_MODELS = (
+    "llama3:8b", "llama3.1:8b", "llama2", "codellama", "mistral", "mixtral:8x7b",
+    "neural-chat", "phi3", "qwen2:7b", "gemma:7b", "llava:13b"
+)
+
+# Model choices offered for each cloud AI provider
+MODEL_OPTIONS = {
+    "OpenAI": (
+        "gpt-4o", "gpt-4o-mini", "gpt-4.1", "gpt-4.1-mini", "o3-mini", "o4-mini", "gpt-3.5-turbo"
+    ),
+    "Anthropic": (
+        "claude-3-opus-20240229", "claude-3-sonnet-20240229", "claude-3-haiku-20240307", "claude-3.5-sonnet"
+    ),
+    "Google (Gemini)": (
+        "gemini-1.5-pro", "gemini-1.5-flash", "gemini-1.0-pro"
+    ),
+    "Azure OpenAI": (
+        "your-deployment-name",
+    ),
+    "Groq": (
+        "llama3-70b-8192", "llama3-8b-8192", "mixtral-8x7b-32768", "gemma-7b-it"
+    ),
+    "Mistral": (
+        "mistral-tiny", "mistral-small", "mistral-medium", "open-mixtral-8x7b"
+    ),
+    "Cohere": (
+        "command", "command-r", "command-r-plus"
+    ),
+    "Together AI": (
+        "meta-llama/Meta-Llama-3-70B-Instruct", "mistralai/Mixtral-8x7B-Instruct-v0.1"
+    ),
+    "OpenRouter": (
+        "openrouter/auto", "anthropic/claude-3.5-sonnet", "meta-llama/llama-3.1-70b-instruct"
+    ),
+    "Perplexity": (
+        "sonar-small-online", "sonar-medium-online", "sonar-large-online"
+    ),
+    "Fireworks AI": (
+        "accounts/fireworks/models/llama-v3-70b-instruct", "accounts/fireworks/models/mixtral-8x7b-instruct"
+    ),
+    "xAI (Grok)": (
+        "grok-beta",
+    ),
+    "DeepSeek": (
+        "deepseek-chat", "deepseek-coder"
+    ),
+    "Custom API": (
+        "model-name",
+    )
+}
+
+# Provider names in display order, taken from the model table
+AI_PROVIDERS = tuple(MODEL_OPTIONS)
+
+@functools.lru_cache(maxsize=16)
+def models_for(provider: str) -> tuple:
+    """Model choices for a cloud AI provider; unknown providers get a placeholder"""
+    return MODEL_OPTIONS.get(provider, ("model-name",))
+
+# Floating chatbot markup; static, so it is built once at import
+KRISHNA_CHATBOT_HTML = """
+    <style>
+    .krishna-fab { position: fixed; bottom: 24px; right: 24px; z-index: 1000; }
+    .krishna-panel { position: fixed; bottom: 90px; right: 24px; width: 360px; height: 480px; background: #111827; color: white; border-radius: 12px; border: 1px solid #374151; box-shadow: 0 8px 24px rgba(0,0,0,0.3); display: none; z-index: 1001; }
+    .krishna-panel.show { display: block; }
+    </style>
+    <button class="krishna-fab" onclick="const p=document.getElementById('krishna-panel'); p.classList.toggle('show');">💬</button>
+    <div id="krishna-panel" class="krishna-panel">
+        <iframe srcdoc="<html><body style='margin:0;background:#111;color:#fff;font-family:sans-serif'>
+        <div style='padding:10px;background:#1f2937;border-bottom:1px solid #374151'>Krishna - Principal DevSecOps Consultant</div>
+        <div id='chat' style='height:392px;overflow:auto;padding:10px'></div>
+        <div style='display:flex'><input id='msg' style='flex:1;padding:8px;background:#111;border:1px solid #374151;color:#fff'><button onclick=\"parent.postMessage({type:'krishna_msg',text:document.getElementById('msg').value},'*');document.getElementById('msg').value=''\" style='padding:8px;background:#2563eb;color:#fff;border:none'>Send</button></div>
+        </body></html>" style="width:100%;height:100%;border:0"></iframe>
+    </div>
+    <script>
+    // Messages sent in quick succession are queued and posted together
+    const KRISHNA_BATCH_SIZE = 8, KRISHNA_BATCH_WAIT_MS = 150;
+    let krishnaQueue = [], krishnaTimer = null;
+    function flushKrishnaQueue(){
+      clearTimeout(krishnaTimer);
+      krishnaTimer = null;
+      const msgs = krishnaQueue;
+      krishnaQueue = [];
+      if(!msgs.length){ return; }
+      const single = msgs.length === 1;
+      fetch(single ? '/krishna_chat' : '/krishna_chat_batch', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify(single ? {text: msgs[0].text} : {msgs})}).catch(()=>{});
+    }
+    window.addEventListener('message', (e)=>{
+      if(e.data && e.data.type==='krishna_msg'){
+        krishnaQueue.push({text: e.data.text || '', ts: Date.now()});
+        if(krishnaQueue.length >= KRISHNA_BATCH_SIZE){
+          flushKrishnaQueue();
+        } else if(!krishnaTimer){
+          krishnaTimer = setTimeout(flushKrishnaQueue, KRISHNA_BATCH_WAIT_MS);
+        }
+      }
+    });
+    </script>
+"""
 
 def render_dashboard():
     """Main dashboard rendering function"""
@@ -34,10 +132,13 @@ def render_dashboard():
     if page == "Dashboard":
         render_main_dashboard()
     elif page == "Pipeline":
+        from ui.components.pipeline_view import render_pipeline_view
         render_pipeline_view()
     elif page == "Agents":
+        from ui.components.agent_status import render_agent_status
         render_agent_status()
     elif page == "Upload":
+        from ui.components.project_upload import render_project_upload
         render_project_upload()
     elif page == "Build Status":
         from ui.components.build_status import render_build_status
@@ -46,6 +147,7 @@ def render_dashboard():
         from ui.components.security_dashboard import render_security_dashboard
         render_security_dashboard()
     elif page == "Reports":
+        from ui.components.reports_viewer import render_reports_viewer
         render_reports_viewer()
     elif page == "Settings":
         render_settings()
@@ -56,6 +158,41 @@ def render_dashboard():
 def render_main_dashboard():
     """Render main dashboard overview"""
     
+    # One snapshot feeds every panel on this page
+    snapshot = st.session_state.state_manager.get_dashboard_snapshot(history_limit=10)
+    current_pipeline = snapshot['current']
+    
+    # Nothing is running: one message stands in for the metrics row and status panel
+    if not current_pipeline:
+        st.info("No active pipeline. Upload a project to get started!")
+    else:
+        render_pipeline_overview(current_pipeline)
+    
+    st.divider()
+    
+    # Recent activity and system health
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📊 System Health")
+        render_system_health_chart()
+    
+    with col2:
+        st.subheader("📈 Pipeline History")
+        render_pipeline_history_chart(snapshot['history'])
+
+    st.divider()
+    st.subheader("🖥️ System Monitoring")
+    render_monitoring_launcher()
+
+@st.fragment
+def render_monitoring_launcher():
+    """Render the monitoring button; clicking it only reruns this fragment"""
+    st.button("Open Monitoring Panel", key="open_monitoring", help="View CPU, RAM, and service health", on_click=open_monitoring)
+
+def render_pipeline_overview(current_pipeline: dict):
+    """Render the status metrics and progress of the active pipeline"""
+    
     # Status metrics row
     col1, col2, col3, col4 = st.columns(4)
     
@@ -90,43 +227,22 @@ def render_main_dashboard():
     st.divider()
     
     # Current pipeline status
-    current_pipeline = st.session_state.state_manager.get_current_pipeline()
-    
-    if current_pipeline:
-        st.subheader("🔄 Current Pipeline Status")
-        
-        # Progress bar
-        progress = current_pipeline.get('progress', 0)
-        st.progress(progress / 100)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.write(f"**Project:** {current_pipeline.get('project_name', 'Unknown')}")
-            st.write(f"**Status:** {current_pipeline.get('status', 'Unknown').title()}")
-        
-        with col2:
-            st.write(f"**Current Step:** {current_pipeline.get('current_step', 'Unknown').title()}")
-            st.write(f"**Progress:** {progress}%")
-    
-    else:
-        st.info("No active pipeline. Upload a project to get started!")
+    st.subheader("🔄 Current Pipeline Status")
     
-    st.divider()
+    # Progress bar
+    progress = current_pipeline.get('progress', 0)
+    st.progress(progress / 100)
     
-    # Recent activity and system health
+    # The same two columns hold one markdown block each
     col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 System Health")
-        render_system_health_chart()
-    
-    with col2:
-        st.subheader("📈 Pipeline History")
-        render_pipeline_history_chart()
-
-    st.divider()
-    st.subheader("🖥️ System Monitoring")
-    st.button("Open Monitoring Panel", key="open_monitoring", help="View CPU, RAM, and service health", on_click=open_monitoring)
+    col1.markdown(
+        f"**Project:** {current_pipeline.get('project_name', 'Unknown')}  \n"
+        f"**Status:** {current_pipeline.get('status', 'Unknown').title()}"
+    )
+    col2.markdown(
+        f"**Current Step:** {current_pipeline.get('current_step', 'Unknown').title()}  \n"
+        f"**Progress:** {progress}%"
+    )
 
 def render_system_health_chart():
     """Render system health metrics chart"""
@@ -140,71 +256,62 @@ def render_system_health_chart():
         'Storage': 34
     }
     
-    fig = go.Figure(data=[
-        go.Bar(
-            x=list(metrics.keys()),
-            y=list(metrics.values()),
-            marker_color=['#00ff88' if v < 70 else '#ff6b6b' if v > 85 else '#ffd93d' for v in metrics.values()]
-        )
-    ])
-    
-    fig.update_layout(
-        title="Resource Utilization",
-        yaxis_title="Usage %",
-        showlegend=False,
-        height=300,
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)'
+    st.bar_chart(
+        build_health_frame(tuple(metrics.items())),
+        x='Resource',
+        y='Usage',
+        color='Color',
+        y_label="Usage %",
+        height=300
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def build_health_frame(metrics: tuple) -> pd.DataFrame:
+    """Build the resource utilization table for (resource, usage %) pairs"""
+    resources, usage = zip(*metrics)
+    usage = np.asarray(usage, dtype=np.int16)
+    
+    # Hex values in the color column are drawn as-is, one color per bar
+    return pd.DataFrame({
+        'Resource': resources,
+        'Usage': usage,
+        'Color': np.select([usage < 70, usage > 85], ['#00ff88', '#ff6b6b'], default='#ffd93d')
+    })
 
 def open_monitoring():
     st.session_state["show_monitoring_panel"] = True
 
 def inject_krishna_chatbot():
     """Adds a floating chatbot button and container in the bottom-right corner."""
-    st.markdown(
-        """
-        <style>
-        .krishna-fab { position: fixed; bottom: 24px; right: 24px; z-index: 1000; }
-        .krishna-panel { position: fixed; bottom: 90px; right: 24px; width: 360px; height: 480px; background: #111827; color: white; border-radius: 12px; border: 1px solid #374151; box-shadow: 0 8px 24px rgba(0,0,0,0.3); display: none; z-index: 1001; }
-        .krishna-panel.show { display: block; }
-        </style>
-        <button class="krishna-fab" onclick="const p=document.getElementById('krishna-panel'); p.classList.toggle('show');">💬</button>
-        <div id="krishna-panel" class="krishna-panel">
-            <iframe srcdoc="<html><body style='margin:0;background:#111;color:#fff;font-family:sans-serif'>
-            <div style='padding:10px;background:#1f2937;border-bottom:1px solid #374151'>Krishna - Principal DevSecOps Consultant</div>
-            <div id='chat' style='height:392px;overflow:auto;padding:10px'></div>
-            <div style='display:flex'><input id='msg' style='flex:1;padding:8px;background:#111;border:1px solid #374151;color:#fff'><button onclick=\"parent.postMessage({type:'krishna_msg',text:document.getElementById('msg').value},'*');document.getElementById('msg').value=''\" style='padding:8px;background:#2563eb;color:#fff;border:none'>Send</button></div>
-            </body></html>" style="width:100%;height:100%;border:0"></iframe>
-        </div>
-        <script>
-        window.addEventListener('message', (e)=>{
-          if(e.data && e.data.type==='krishna_msg'){
-            const text = e.data.text || '';
-            const payload = {text};
-            fetch('/krishna_chat', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify(payload)}).catch(()=>{});
-          }
-        });
-        </script>
-        """,
-        unsafe_allow_html=True,
-    )
+    # Emitted on every run: Streamlit drops elements a rerun does not repeat
+    st.markdown(KRISHNA_CHATBOT_HTML, unsafe_allow_html=True)
 
-def render_pipeline_history_chart():
+def render_pipeline_history_chart(history: list):
     """Render pipeline execution history"""
     
-    # Mock pipeline history data
-    history = st.session_state.state_manager.get_pipeline_history(limit=10)
-    
     if not history:
         st.info("No pipeline history available")
         return
     
+    # Only the charted fields take part in the cache key
+    fig = build_history_figure(tuple(
+        (run['project_name'], run['start_time'], run['end_time'], run['status'])
+        for run in history
+    ))
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def build_history_figure(runs: tuple):
+    """Build the pipeline timeline for (project_name, start_time, end_time, status) rows"""
+    # Timelines have no native Streamlit equivalent; load plotly only when one is drawn
+    import plotly.express as px
+    
     # Create timeline chart
     fig = px.timeline(
-        history,
+        [
+            {'project_name': project_name, 'start_time': start_time, 'end_time': end_time, 'status': status}
+            for project_name, start_time, end_time, status in runs
+        ],
         x_start="start_time",
         x_end="end_time", 
         y="project_name",
@@ -213,8 +320,9 @@ def render_pipeline_history_chart():
     )
     
     fig.update_layout(height=300)
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
+@st.fragment
 def render_settings():
     """Render settings page"""
     st.subheader("⚙️ Platform Settings")
@@ -227,97 +335,56 @@ def render_settings():
         help="Local mode uses only local resources. Hybrid allows optional cloud services. Cloud Enhanced uses cloud AI models."
     )
     
+    # Choices that change which fields are shown stay outside the form so the page updates at once
     if mode != "Local Only":
         st.subheader("☁️ Cloud Configuration")
         
         cloud_provider = st.selectbox(
             "Cloud Provider",
-            ["AWS", "Azure", "GCP", "On-Premises"]
+            CLOUD_PROVIDERS
         )
         
-        if cloud_provider != "On-Premises":
-            st.text_input("API Key", type="password")
-            st.text_input("Region", value="us-east-1")
-    
-    # AI Model settings
-    st.subheader("🤖 AI Model Configuration")
-    
-    local_model = st.selectbox(
-        "Local LLM (via Ollama)",
-        [
-            "llama3:8b", "llama3.1:8b", "llama2", "codellama", "mistral", "mixtral:8x7b",
-            "neural-chat", "phi3", "qwen2:7b", "gemma:7b", "llava:13b"
-        ]
-    )
-    
-    if mode != "Local Only":
         provider = st.selectbox(
             "Cloud Provider",
-            [
-                "OpenAI", "Anthropic", "Google (Gemini)", "Azure OpenAI", "Groq",
-                "Mistral", "Cohere", "Together AI", "OpenRouter", "Perplexity",
-                "Fireworks AI", "xAI (Grok)", "DeepSeek", "Custom API"
-            ]
-        )
-
-        model_options = {
-            "OpenAI": [
-                "gpt-4o", "gpt-4o-mini", "gpt-4.1", "gpt-4.1-mini", "o3-mini", "o4-mini", "gpt-3.5-turbo"
-            ],
-            "Anthropic": [
-                "claude-3-opus-20240229", "claude-3-sonnet-20240229", "claude-3-haiku-20240307", "claude-3.5-sonnet"
-            ],
-            "Google (Gemini)": [
-                "gemini-1.5-pro", "gemini-1.5-flash", "gemini-1.0-pro"
-            ],
-            "Azure OpenAI": [
-                "your-deployment-name"
-            ],
-            "Groq": [
-                "llama3-70b-8192", "llama3-8b-8192", "mixtral-8x7b-32768", "gemma-7b-it"
-            ],
-            "Mistral": [
-                "mistral-tiny", "mistral-small", "mistral-medium", "open-mixtral-8x7b"
-            ],
-            "Cohere": [
-                "command", "command-r", "command-r-plus"
-            ],
-            "Together AI": [
-                "meta-llama/Meta-Llama-3-70B-Instruct", "mistralai/Mixtral-8x7B-Instruct-v0.1"
-            ],
-            "OpenRouter": [
-                "openrouter/auto", "anthropic/claude-3.5-sonnet", "meta-llama/llama-3.1-70b-instruct"
-            ],
-            "Perplexity": [
-                "sonar-small-online", "sonar-medium-online", "sonar-large-online"
-            ],
-            "Fireworks AI": [
-                "accounts/fireworks/models/llama-v3-70b-instruct", "accounts/fireworks/models/mixtral-8x7b-instruct"
-            ],
-            "xAI (Grok)": [
-                "grok-beta"
-            ],
-            "DeepSeek": [
-                "deepseek-chat", "deepseek-coder"
-            ],
-            "Custom API": [
-                "model-name"
-            ]
-        }
-
-        cloud_model = st.selectbox(
-            "Cloud AI Model",
-            model_options.get(provider, ["model-name"])
+            AI_PROVIDERS
         )
-        st.caption("Tip: For Custom API and some providers, set the endpoint in Settings or config.")
-    
-    # Security settings
-    st.subheader("🔒 Security Configuration")
     
-    st.checkbox("Enable vulnerability auto-patching", value=True)
-    st.checkbox("Strict compliance mode", value=False)
-    st.checkbox("Enable audit logging", value=True)
+    config = load_config()
     
-    # Save settings
-    if st.button("💾 Save Settings", type="primary"):
+    # Everything else is batched: editing these fields does not rerun until the form is submitted
+    with st.form("settings_form"):
+        if mode != "Local Only" and cloud_provider != "On-Premises":
+            st.text_input("API Key", type="password")
+            st.text_input("Region", value="us-east-1")
+        
+        # AI Model settings
+        st.subheader("🤖 AI Model Configuration")
+        
+        local_model = st.selectbox(
+            "Local LLM (via Ollama)",
+            LOCAL_MODELS
+        )
+        
+        if mode != "Local Only":
+            cloud_model = st.selectbox(
+                "Cloud AI Model",
+                models_for(provider)
+            )
+            st.caption("Tip: For Custom API and some providers, set the endpoint in Settings or config.")
+        
+        # Security settings
+        st.subheader("🔒 Security Configuration")
+        
+        auto_patch = st.checkbox("Enable vulnerability auto-patching", value=config.get('security.auto_patch', True))
+        strict_compliance = st.checkbox("Strict compliance mode", value=config.get('security.strict_compliance', False))
+        audit_logging = st.checkbox("Enable audit logging", value=config.get('security.audit_logging', True))
+        
+        # Save settings; changes are collected in memory and written once
+        submitted = st.form_submit_button("💾 Save Settings", type="primary")
+    
+    if submitted:
+        config.set('security.auto_patch', auto_patch)
+        config.set('security.strict_compliance', strict_compliance)
+        config.set('security.audit_logging', audit_logging)
+        config.flush()
         st.success("Settings saved successfully!")
@@ -3,24 +3,68 @@ Configuration management for VedOps platform
 """
 
 import os
+import copy
+import functools
+import json
+import tempfile
+import threading
 import yaml
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader, SafeDumper
+
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON config parsing when available
+    orjson = None
+
+try:
+    import streamlit as st
+except ImportError:  # Optional: only the dashboard shares one Config per process
+    st = None
+
+@functools.lru_cache(maxsize=4)
+def _read_config_file(config_path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a config file; the mtime in the key forces a re-read after edits"""
+    if config_path.endswith('.json'):
+        data = Path(config_path).read_bytes()
+        return orjson.loads(data) if orjson else json.loads(data)
+    
+    with open(config_path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+def _resolve_config_path(config_path: Path) -> Path:
+    """A JSON config next to the YAML one takes precedence; it parses faster"""
+    json_path = config_path.with_suffix('.json')
+    if config_path.suffix != '.json' and json_path.exists():
+        return json_path
+    return config_path
+
 class Config:
     """Configuration manager"""
     
     def __init__(self, config_path: str = "config.yaml"):
-        self.config_path = Path(config_path)
+        self.config_path = _resolve_config_path(Path(config_path))
+        
         self.config = self._load_config()
+        self._flat = self._flatten(self.config)
         self.logger = logging.getLogger(__name__)
+        
+        # set() only marks the config dirty; flush() persists all pending changes at once
+        self._dirty = False
+        self._write_lock = threading.Lock()
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
         if self.config_path.exists():
-            with open(self.config_path, 'r') as f:
-                return yaml.safe_load(f)
+            mtime_ns = self.config_path.stat().st_mtime_ns
+            # Copy so that set() on one instance cannot leak into the cached parse
+            return copy.deepcopy(_read_config_file(str(self.config_path), mtime_ns))
         else:
             return self._get_default_config()
     
@@ -52,37 +96,84 @@ class Config:
             }
         }
     
-    def get(self, key: str, default: Any = None) -> Any:
-        """Get configuration value"""
-        keys = key.split('.')
-        value = self.config
+    def _flatten(self, config: Any, prefix: str = '') -> Dict[str, Any]:
+        """Index every node of the config by its dotted path, sections included"""
+        flat = {}
         
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
+        if isinstance(config, dict):
+            for k, value in config.items():
+                if not isinstance(k, str):
+                    continue
+                path = f"{prefix}{k}"
+                flat[path] = value
+                flat.update(self._flatten(value, f"{path}."))
         
-        return value
+        return flat
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get configuration value"""
+        return self._flat.get(key, default)
     
     def set(self, key: str, value: Any):
-        """Set configuration value"""
+        """Set configuration value; call flush() to persist it"""
         keys = key.split('.')
-        config = self.config
-        
-        for k in keys[:-1]:
-            if k not in config:
-                config[k] = {}
-            config = config[k]
         
-        config[keys[-1]] = value
-        self._save_config()
+        # The dashboard shares one instance between all sessions
+        with self._write_lock:
+            config = self.config
+            for k in keys[:-1]:
+                if k not in config:
+                    config[k] = {}
+                config = config[k]
+            
+            config[keys[-1]] = value
+            # The new value may replace a whole section, so re-index from the top
+            self._flat = self._flatten(self.config)
+            self._dirty = True
+    
+    def flush(self):
+        """Write pending changes to file, if there are any"""
+        with self._write_lock:
+            if not self._dirty:
+                return
+            self._save_config()
+            self._dirty = False
     
     def _save_config(self):
-        """Save configuration to file"""
-        with open(self.config_path, 'w') as f:
-            yaml.dump(self.config, f, default_flow_style=False)
+        """Save configuration to file atomically via a sibling temp file"""
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.config_path.parent, prefix=f".{self.config_path.name}.", suffix=".tmp"
+        )
+        
+        try:
+            with os.fdopen(fd, 'wb' if self.config_path.suffix == '.json' else 'w') as f:
+                if self.config_path.suffix == '.json':
+                    if orjson:
+                        f.write(orjson.dumps(self.config, option=orjson.OPT_INDENT_2))
+                    else:
+                        f.write(json.dumps(self.config, indent=2).encode())
+                else:
+                    yaml.dump(self.config, f, Dumper=SafeDumper, default_flow_style=False)
+            
+            # mkstemp creates the file owner-only; keep the permissions of the file being replaced
+            os.chmod(tmp_path, self.config_path.stat().st_mode & 0o777 if self.config_path.exists() else 0o644)
+            
+            # Readers see either the old file or the new one, never a partial write
+            os.replace(tmp_path, self.config_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+def _cached_config(config_path: str, mtime_ns: Optional[int]) -> Config:
+    """Build the Config for one version of a config file; mtime_ns only keys the cache"""
+    return Config(config_path)
+
+if st is not None:
+    # Build the Config once per file version instead of on every Streamlit rerun
+    _cached_config = st.cache_resource(show_spinner=False, max_entries=1)(_cached_config)
 
-def load_config() -> Config:
-    """Load global configuration"""
-    return Config()
+def load_config(config_path: str = "config.yaml") -> Config:
+    """Load global configuration, rebuilt when the file on disk changes"""
+    path = _resolve_config_path(Path(config_path))
+    mtime_ns = path.stat().st_mtime_ns if path.exists() else None
+    return _cached_config(str(path), mtime_ns)
@@ -2,19 +2,342 @@ import sqlite3
 import json
 import os
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 import logging
 import threading
+import time
+import weakref
+from bisect import bisect_left
 from contextlib import contextmanager
+from urllib.request import pathname2url
+
+try:
+    import orjson
+except ImportError:  # Optional: faster serialization of large JSON columns
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: large JSON columns are then stored uncompressed
+    zstandard = None
 
 logger = logging.getLogger(__name__)
 
+# Stored for the common "nothing supplied" case without calling the encoder
+EMPTY_JSON_OBJECT = "{}"
+EMPTY_JSON_ARRAY = "[]"
+
+# Baseline schema (version 1); later changes go in MIGRATIONS, never edit this in place
+
+SCHEMA_SQL = """
+-- Pipeline runs table
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_name TEXT NOT NULL,
+    project_type TEXT NOT NULL,
+    project_url TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    config TEXT NOT NULL,
+    results TEXT,
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    duration_seconds INTEGER,
+    user_id TEXT DEFAULT 'anonymous',
+    tags TEXT DEFAULT '[]'
+);
+
+-- Agent executions table
+CREATE TABLE IF NOT EXISTS agent_executions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pipeline_run_id INTEGER NOT NULL,
+    agent_name TEXT NOT NULL,
+    agent_type TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    input_data TEXT,
+    output_data TEXT,
+    error_message TEXT,
+    started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    completed_at TIMESTAMP,
+    duration_seconds INTEGER,
+    retry_count INTEGER DEFAULT 0,
+    max_retries INTEGER DEFAULT 3,
+    FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE
+);
+
+-- Security findings table
+CREATE TABLE IF NOT EXISTS security_findings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pipeline_run_id INTEGER NOT NULL,
+    agent_execution_id INTEGER,
+    severity TEXT NOT NULL,
+    category TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    file_path TEXT,
+    line_number INTEGER,
+    column_number INTEGER,
+    rule_id TEXT,
+    remediation TEXT,
+    status TEXT DEFAULT 'open',
+    false_positive BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    resolved_at TIMESTAMP,
+    FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE,
+    FOREIGN KEY (agent_execution_id) REFERENCES agent_executions (id) ON DELETE SET NULL
+);
+
+-- Performance metrics table
+CREATE TABLE IF NOT EXISTS performance_metrics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pipeline_run_id INTEGER NOT NULL,
+    agent_execution_id INTEGER,
+    metric_name TEXT NOT NULL,
+    metric_value REAL NOT NULL,
+    metric_unit TEXT,
+    metric_type TEXT DEFAULT 'gauge',
+    labels TEXT DEFAULT '{}',
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE,
+    FOREIGN KEY (agent_execution_id) REFERENCES agent_executions (id) ON DELETE SET NULL
+);
+
+-- Build artifacts table
+CREATE TABLE IF NOT EXISTS build_artifacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pipeline_run_id INTEGER NOT NULL,
+    agent_execution_id INTEGER,
+    artifact_type TEXT NOT NULL,
+    artifact_name TEXT NOT NULL,
+    artifact_path TEXT,
+    artifact_size INTEGER,
+    artifact_hash TEXT,
+    metadata TEXT DEFAULT '{}',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE,
+    FOREIGN KEY (agent_execution_id) REFERENCES agent_executions (id) ON DELETE SET NULL
+);
+
+-- Deployment history table
+CREATE TABLE IF NOT EXISTS deployment_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pipeline_run_id INTEGER NOT NULL,
+    environment TEXT NOT NULL,
+    deployment_type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    endpoint_url TEXT,
+    deployment_config TEXT,
+    rollback_info TEXT,
+    deployed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    rolled_back_at TIMESTAMP,
+    FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE
+);
+
+-- Configuration history table
+CREATE TABLE IF NOT EXISTS configuration_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    config_type TEXT NOT NULL,
+    config_name TEXT NOT NULL,
+    config_data TEXT NOT NULL,
+    version INTEGER DEFAULT 1,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    created_by TEXT DEFAULT 'system'
+);
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_created_at ON pipeline_runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_agent_executions_pipeline_run_id ON agent_executions(pipeline_run_id);
+CREATE INDEX IF NOT EXISTS idx_security_findings_pipeline_run_id ON security_findings(pipeline_run_id);
+CREATE INDEX IF NOT EXISTS idx_security_findings_severity ON security_findings(severity);
+CREATE INDEX IF NOT EXISTS idx_performance_metrics_pipeline_run_id ON performance_metrics(pipeline_run_id);
+
+-- History filters by status/user and sorts by recency; these serve the ORDER BY too
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_user_created ON pipeline_runs(user_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_status_created ON pipeline_runs(status, created_at DESC);
+-- Superseded by idx_pipeline_runs_status_created
+DROP INDEX IF EXISTS idx_pipeline_runs_status;
+"""
+
+# Scripts that bring a database from the previous version up to the keyed version
+MIGRATIONS = {
+    # Epoch-second timestamps next to the text ones: durations and age cutoffs become
+    # integer arithmetic instead of parsing date strings
+    2: """
+ALTER TABLE pipeline_runs ADD COLUMN created_at_ts INTEGER;
+ALTER TABLE pipeline_runs ADD COLUMN started_at_ts INTEGER;
+ALTER TABLE pipeline_runs ADD COLUMN completed_at_ts INTEGER;
+UPDATE pipeline_runs SET
+    created_at_ts = CAST(strftime('%s', created_at) AS INTEGER),
+    started_at_ts = CAST(strftime('%s', started_at) AS INTEGER),
+    completed_at_ts = CAST(strftime('%s', completed_at) AS INTEGER);
+
+ALTER TABLE agent_executions ADD COLUMN started_at_ts INTEGER;
+ALTER TABLE agent_executions ADD COLUMN completed_at_ts INTEGER;
+UPDATE agent_executions SET
+    started_at_ts = CAST(strftime('%s', started_at) AS INTEGER),
+    completed_at_ts = CAST(strftime('%s', completed_at) AS INTEGER);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_created_at_ts ON pipeline_runs(created_at_ts);
+""",
+    # Everything get_security_summary reads, so it never touches the wide finding rows;
+    # its leading column also covers lookups by run, making the old run index redundant
+    3: """
+CREATE INDEX IF NOT EXISTS idx_security_findings_summary
+    ON security_findings(pipeline_run_id, severity, status, false_positive);
+DROP INDEX IF EXISTS idx_security_findings_pipeline_run_id;
+""",
+    # Metric names repeat on every row; store each once and reference it by integer id
+    4: """
+CREATE TABLE IF NOT EXISTS metric_names (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+INSERT OR IGNORE INTO metric_names (name) SELECT DISTINCT metric_name FROM performance_metrics;
+
+CREATE TABLE performance_metrics_v4 (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pipeline_run_id INTEGER NOT NULL,
+    agent_execution_id INTEGER,
+    metric_name_id INTEGER NOT NULL,
+    metric_value REAL NOT NULL,
+    metric_unit TEXT,
+    metric_type TEXT DEFAULT 'gauge',
+    labels TEXT DEFAULT '{}',
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE,
+    FOREIGN KEY (agent_execution_id) REFERENCES agent_executions (id) ON DELETE SET NULL,
+    FOREIGN KEY (metric_name_id) REFERENCES metric_names (id)
+);
+INSERT INTO performance_metrics_v4
+    (id, pipeline_run_id, agent_execution_id, metric_name_id, metric_value,
+     metric_unit, metric_type, labels, timestamp)
+SELECT pm.id, pm.pipeline_run_id, pm.agent_execution_id, mn.id, pm.metric_value,
+       pm.metric_unit, pm.metric_type, pm.labels, pm.timestamp
+FROM performance_metrics pm JOIN metric_names mn ON mn.name = pm.metric_name;
+DROP TABLE performance_metrics;
+ALTER TABLE performance_metrics_v4 RENAME TO performance_metrics;
+CREATE INDEX IF NOT EXISTS idx_performance_metrics_pipeline_run_id ON performance_metrics(pipeline_run_id);
+"""
+}
+
+SCHEMA_VERSION = max(MIGRATIONS)
+
+# INSERT ... RETURNING hands back the new id from the same statement (SQLite 3.35+)
+RETURNING_ID = " RETURNING id" if sqlite3.sqlite_version_info >= (3, 35, 0) else ""
+
+# Columns returned by get_pipeline_history, in SELECT order
+HISTORY_COLUMNS = (
+    'id', 'project_name', 'project_type', 'status', 'created_at',
+    'started_at', 'completed_at', 'duration_seconds', 'user_id', 'tags'
+)
+
+# Tables reported by get_database_stats
+STATS_TABLES = (
+    'pipeline_runs', 'agent_executions', 'security_findings',
+    'performance_metrics', 'build_artifacts', 'deployment_history'
+)
+
+TABLE_COUNTS_SQL = " UNION ALL ".join(
+    f"SELECT '{table}', COUNT(*) FROM {table}" for table in STATS_TABLES
+)
+
+# Open findings weigh into the security score by severity; computed in SQL
+SEVERITY_WEIGHT_SQL = """
+    CASE severity
+        WHEN 'critical' THEN 10
+        WHEN 'high' THEN 5
+        WHEN 'medium' THEN 2
+        WHEN 'low' THEN 1
+        ELSE 0
+    END
+"""
+
+# Upper bounds of the weighted total for each score bucket, best first
+SECURITY_SCORE_THRESHOLDS = (0, 5, 15, 30)
+SECURITY_SCORES = (100, 90, 75, 50, 25)
+
+def _dumps(value: Any) -> str:
+    """Serialize a JSON column value compactly"""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, separators=(",", ":"))
+
+# Leading byte of an encoded JSON blob; plain TEXT rows predate the header
+BLOB_RAW = 0x00
+BLOB_ZSTD = 0x01
+
+# Smaller documents rarely shrink enough to be worth a compressor round trip
+COMPRESS_MIN_BYTES = 1024
+
+def _encode(value: Any) -> bytes:
+    """Serialize a large JSON column value, zstd-compressed when it pays off"""
+    data = _dumps(value).encode()
+    if zstandard is not None and len(data) >= COMPRESS_MIN_BYTES:
+        return bytes((BLOB_ZSTD,)) + zstandard.compress(data, 3)
+    return bytes((BLOB_RAW,)) + data
+
+def _decode(value: Any, default: Any) -> Any:
+    """Parse a JSON column written by _encode, or a plain TEXT one from older rows"""
+    if not value:
+        return default
+    if isinstance(value, str):
+        return json.loads(value)
+    if value[0] == BLOB_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read compressed database columns")
+        return json.loads(zstandard.decompress(value[1:]))
+    return json.loads(value[1:])
+
+# Per-connection settings; these do not persist in the database file
+CONNECTION_PRAGMAS = (
+    "PRAGMA busy_timeout = 30000",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -64000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA foreign_keys = ON"
+)
+
+def _close_connections(opened: list):
+    """Close connections a thread opened; (conn, optimize) pairs, emptied as they go"""
+    while opened:
+        conn, optimize = opened.pop()
+        try:
+            if optimize:
+                # SQLite recommends optimize right before closing a long-lived connection
+                conn.execute("PRAGMA optimize")
+            conn.close()
+        except sqlite3.Error as e:
+            logger.debug("Failed to close database connection: %s", e)
+
+class _ThreadConnections:
+    """One thread's connections, kept in a threading.local
+    
+    The local drops this holder when its thread ends, and a finalizer then
+    closes the connections, so short-lived worker threads don't leak them.
+    """
+    __slots__ = ('conn', 'read_conn', 'opened', '__weakref__')
+    
+    def __init__(self):
+        self.conn = None
+        self.read_conn = None
+        # Shared with the finalizer, which must not reference the holder itself
+        self.opened = []
+
 class DatabaseManager:
     """Thread-safe database manager for VedOps with comprehensive persistence"""
     
     def __init__(self, db_path: str = "data/vedops.db"):
         self.db_path = db_path
-        self.lock = threading.Lock()
+        # One long-lived connection per thread; WAL and busy_timeout serialize writers
+        self._local = threading.local()
+        # Finalizers of every live thread's connections, so close_all can run them early
+        self._finalizers = []
+        self._connections_lock = threading.Lock()
+        # metric_names rows are never deleted, so a name's id stays valid for good
+        self._metric_name_cache = {}
         self.ensure_db_dir()
         self.init_database()
     
@@ -22,166 +345,143 @@ class DatabaseManager:
         """Ensure database directory exists"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
     
+    def _thread_connections(self) -> _ThreadConnections:
+        """This thread's connection holder, registering its finalizer on first use"""
+        holder = getattr(self._local, 'holder', None)
+        
+        if holder is None:
+            holder = self._local.holder = _ThreadConnections()
+            finalizer = weakref.finalize(holder, _close_connections, holder.opened)
+            with self._connections_lock:
+                # Drop finalizers of threads that have already ended
+                self._finalizers = [f for f in self._finalizers if f.alive]
+                self._finalizers.append(finalizer)
+        
+        return holder
+    
     @contextmanager
     def get_connection(self):
-        """Thread-safe database connection context manager"""
-        with self.lock:
-            conn = sqlite3.connect(self.db_path, timeout=30.0)
+        """Yield this thread's database connection, opening it on first use"""
+        holder = self._thread_connections()
+        conn = holder.conn
+        
+        if conn is None:
+            # Autocommit: each statement commits on its own. busy_timeout below
+            # takes over from the Python-level timeout
+            # The connection lives on, so its statement cache keeps hot inserts pre-parsed
+            conn = sqlite3.connect(
+                self.db_path, check_same_thread=False, isolation_level=None, cached_statements=256
+            )
             conn.row_factory = sqlite3.Row  # Enable dict-like access
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            
+            holder.conn = conn
+            holder.opened.append((conn, True))
+        
+        yield conn
+    
+    @contextmanager
+    def _read_connection(self):
+        """Yield this thread's read-only connection, opening it on first use
+        
+        Read-only handles never take the write lock, so history and summary
+        queries cannot contend with writers.
+        """
+        if self.db_path == ':memory:':
+            # A second handle would open a different, empty database
+            with self.get_connection() as conn:
+                yield conn
+            return
+        
+        holder = self._thread_connections()
+        conn = holder.read_conn
+        
+        if conn is None:
+            conn = sqlite3.connect(
+                f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro", uri=True,
+                check_same_thread=False, isolation_level=None, cached_statements=256
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            conn.execute("PRAGMA query_only = ON")
+            
+            holder.read_conn = conn
+            holder.opened.append((conn, False))
+        
+        yield conn
+    
+    @contextmanager
+    def _write_transaction(self):
+        """Group several writes into one BEGIN IMMEDIATE ... COMMIT"""
+        with self.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
             try:
                 yield conn
-            finally:
-                conn.close()
+                conn.execute("COMMIT")
+            except BaseException:
+                # The connection outlives this call, so even an interrupt must not leave it
+                # holding the write lock; a failed rollback must not mask the original error
+                try:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                except sqlite3.Error as e:
+                    logger.error("Failed to roll back transaction: %s", e)
+                raise
+    
+    @staticmethod
+    def _inserted_id(cursor: sqlite3.Cursor) -> int:
+        """Id of the row an INSERT ... RETURNING_ID statement just created"""
+        if RETURNING_ID:
+            # Drain the statement so it finishes before the surrounding COMMIT
+            return cursor.fetchall()[0][0]
+        return cursor.lastrowid
+    
+    def close_all(self):
+        """Close every thread's connection now, without waiting for the threads to end"""
+        with self._connections_lock:
+            finalizers, self._finalizers = self._finalizers, []
+        
+        # Each finalizer runs at most once, so threads that end later close nothing twice
+        for finalizer in finalizers:
+            finalizer()
+        
+        self._local = threading.local()
     
     def init_database(self):
         """Initialize all database tables"""
         try:
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Pipeline runs table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS pipeline_runs (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        project_name TEXT NOT NULL,
-                        project_type TEXT NOT NULL,
-                        project_url TEXT,
-                        status TEXT NOT NULL DEFAULT 'pending',
-                        config TEXT NOT NULL,
-                        results TEXT,
-                        error_message TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        started_at TIMESTAMP,
-                        completed_at TIMESTAMP,
-                        duration_seconds INTEGER,
-                        user_id TEXT DEFAULT 'anonymous',
-                        tags TEXT DEFAULT '[]'
-                    )
-                """)
-                
-                # Agent executions table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS agent_executions (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        pipeline_run_id INTEGER NOT NULL,
-                        agent_name TEXT NOT NULL,
-                        agent_type TEXT NOT NULL,
-                        status TEXT NOT NULL DEFAULT 'pending',
-                        input_data TEXT,
-                        output_data TEXT,
-                        error_message TEXT,
-                        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        completed_at TIMESTAMP,
-                        duration_seconds INTEGER,
-                        retry_count INTEGER DEFAULT 0,
-                        max_retries INTEGER DEFAULT 3,
-                        FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE
+                # Skipping the schema once it is current saves parsing it on every start
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                
+                if version >= SCHEMA_VERSION:
+                    logger.info("Database schema is up to date")
+                else:
+                    # Lets cleanup hand freed pages back to the OS. Only takes effect on a new
+                    # database: it must be set before the first table is created
+                    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                    
+                    # WAL lets readers run alongside the writer; the mode persists in the file
+                    if self.db_path != ':memory:':
+                        conn.execute("PRAGMA journal_mode = WAL")
+                    
+                    # Databases from before versioning report 0 but already hold the
+                    # baseline tables; the baseline is idempotent, so both run it
+                    script = [SCHEMA_SQL] if version < 1 else []
+                    script.extend(MIGRATIONS[v] for v in range(max(version, 1) + 1, SCHEMA_VERSION + 1))
+                    
+                    # All tables, indexes, migrations and the version stamp land in one transaction
+                    conn.executescript(
+                        "BEGIN;\n" + "\n".join(script) + f"\nPRAGMA user_version = {SCHEMA_VERSION};\nCOMMIT;"
                     )
-                """)
-                
-                # Security findings table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS security_findings (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        pipeline_run_id INTEGER NOT NULL,
-                        agent_execution_id INTEGER,
-                        severity TEXT NOT NULL,
-                        category TEXT NOT NULL,
-                        title TEXT NOT NULL,
-                        description TEXT,
-                        file_path TEXT,
-                        line_number INTEGER,
-                        column_number INTEGER,
-                        rule_id TEXT,
-                        remediation TEXT,
-                        status TEXT DEFAULT 'open',
-                        false_positive BOOLEAN DEFAULT FALSE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        resolved_at TIMESTAMP,
-                        FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE,
-                        FOREIGN KEY (agent_execution_id) REFERENCES agent_executions (id) ON DELETE SET NULL
-                    )
-                """)
-                
-                # Performance metrics table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS performance_metrics (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        pipeline_run_id INTEGER NOT NULL,
-                        agent_execution_id INTEGER,
-                        metric_name TEXT NOT NULL,
-                        metric_value REAL NOT NULL,
-                        metric_unit TEXT,
-                        metric_type TEXT DEFAULT 'gauge',
-                        labels TEXT DEFAULT '{}',
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE,
-                        FOREIGN KEY (agent_execution_id) REFERENCES agent_executions (id) ON DELETE SET NULL
-                    )
-                """)
-                
-                # Build artifacts table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS build_artifacts (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        pipeline_run_id INTEGER NOT NULL,
-                        agent_execution_id INTEGER,
-                        artifact_type TEXT NOT NULL,
-                        artifact_name TEXT NOT NULL,
-                        artifact_path TEXT,
-                        artifact_size INTEGER,
-                        artifact_hash TEXT,
-                        metadata TEXT DEFAULT '{}',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE,
-                        FOREIGN KEY (agent_execution_id) REFERENCES agent_executions (id) ON DELETE SET NULL
-                    )
-                """)
-                
-                # Deployment history table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS deployment_history (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        pipeline_run_id INTEGER NOT NULL,
-                        environment TEXT NOT NULL,
-                        deployment_type TEXT NOT NULL,
-                        status TEXT NOT NULL,
-                        endpoint_url TEXT,
-                        deployment_config TEXT,
-                        rollback_info TEXT,
-                        deployed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        rolled_back_at TIMESTAMP,
-                        FOREIGN KEY (pipeline_run_id) REFERENCES pipeline_runs (id) ON DELETE CASCADE
-                    )
-                """)
-                
-                # Configuration history table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS configuration_history (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        config_type TEXT NOT NULL,
-                        config_name TEXT NOT NULL,
-                        config_data TEXT NOT NULL,
-                        version INTEGER DEFAULT 1,
-                        is_active BOOLEAN DEFAULT TRUE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        created_by TEXT DEFAULT 'system'
-                    )
-                """)
-                
-                # Create indexes for better performance
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_pipeline_runs_status ON pipeline_runs(status)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_pipeline_runs_created_at ON pipeline_runs(created_at)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_executions_pipeline_run_id ON agent_executions(pipeline_run_id)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_security_findings_pipeline_run_id ON security_findings(pipeline_run_id)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_security_findings_severity ON security_findings(severity)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_performance_metrics_pipeline_run_id ON performance_metrics(pipeline_run_id)")
-                
-                conn.commit()
-                logger.info("Database initialized successfully with all tables and indexes")
+                    logger.info("Database initialized successfully with all tables and indexes")
+            
+            self.optimize()
                 
         except Exception as e:
-            logger.error(f"Failed to initialize database: {e}")
+            logger.error("Failed to initialize database: %s", e)
             raise
     
     def create_pipeline_run(self, project_name: str, project_type: str, 
@@ -189,28 +489,28 @@ class DatabaseManager:
                            user_id: str = "anonymous", tags: List[str] = None) -> int:
         """Create a new pipeline run record"""
         try:
-            with self.get_connection() as conn:
+            with self._write_transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO pipeline_runs 
-                    (project_name, project_type, project_url, config, user_id, tags)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (
+                    (project_name, project_type, project_url, config, user_id, tags, created_at_ts)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """ + RETURNING_ID, (
                     project_name, 
                     project_type, 
                     project_url,
-                    json.dumps(config), 
+                    _encode(config) if config else EMPTY_JSON_OBJECT, 
                     user_id,
-                    json.dumps(tags or [])
+                    _dumps(tags) if tags else EMPTY_JSON_ARRAY,
+                    int(time.time())
                 ))
                 
-                run_id = cursor.lastrowid
-                conn.commit()
-                logger.info(f"Created pipeline run {run_id} for project {project_name}")
+                run_id = self._inserted_id(cursor)
+                logger.info("Created pipeline run %s for project %s", run_id, project_name)
                 return run_id
                 
         except Exception as e:
-            logger.error(f"Failed to create pipeline run: {e}")
+            logger.error("Failed to create pipeline run: %s", e)
             raise
     
     def update_pipeline_run(self, run_id: int, status: str, 
@@ -218,24 +518,32 @@ class DatabaseManager:
                            error_message: Optional[str] = None):
         """Update pipeline run status and results"""
         try:
-            with self.get_connection() as conn:
+            with self._write_transaction() as conn:
                 cursor = conn.cursor()
                 
                 update_fields = ["status = ?"]
                 params = [status]
+                now = int(time.time())
                 
-                if status == 'running' and not self.get_pipeline_run(run_id).get('started_at'):
-                    update_fields.append("started_at = CURRENT_TIMESTAMP")
+                if status == 'running':
+                    # Only the first transition to running stamps the start time
+                    update_fields.extend([
+                        "started_at = COALESCE(started_at, CURRENT_TIMESTAMP)",
+                        "started_at_ts = COALESCE(started_at_ts, ?)"
+                    ])
+                    params.append(now)
                 
                 if status in ['completed', 'failed']:
                     update_fields.extend([
                         "completed_at = CURRENT_TIMESTAMP",
-                        "duration_seconds = (julianday(CURRENT_TIMESTAMP) - julianday(COALESCE(started_at, created_at))) * 86400"
+                        "completed_at_ts = ?",
+                        "duration_seconds = ? - COALESCE(started_at_ts, created_at_ts)"
                     ])
+                    params.extend([now, now])
                 
                 if results:
                     update_fields.append("results = ?")
-                    params.append(json.dumps(results))
+                    params.append(_encode(results))
                 
                 if error_message:
                     update_fields.append("error_message = ?")
@@ -249,17 +557,16 @@ class DatabaseManager:
                     WHERE id = ?
                 """, params)
                 
-                conn.commit()
-                logger.info(f"Updated pipeline run {run_id} status to {status}")
+                logger.info("Updated pipeline run %s status to %s", run_id, status)
                 
         except Exception as e:
-            logger.error(f"Failed to update pipeline run: {e}")
+            logger.error("Failed to update pipeline run: %s", e)
             raise
     
     def get_pipeline_run(self, run_id: int) -> Optional[Dict[str, Any]]:
         """Get pipeline run by ID"""
         try:
-            with self.get_connection() as conn:
+            with self._read_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT * FROM pipeline_runs WHERE id = ?", (run_id,))
                 row = cursor.fetchone()
@@ -267,15 +574,15 @@ class DatabaseManager:
                 if row:
                     result = dict(row)
                     # Parse JSON fields
-                    result['config'] = json.loads(result['config']) if result['config'] else {}
-                    result['results'] = json.loads(result['results']) if result['results'] else {}
+                    result['config'] = _decode(result['config'], {})
+                    result['results'] = _decode(result['results'], {})
                     result['tags'] = json.loads(result['tags']) if result['tags'] else []
                     return result
                 
                 return None
                 
         except Exception as e:
-            logger.error(f"Failed to get pipeline run: {e}")
+            logger.error("Failed to get pipeline run: %s", e)
             return None
     
     def create_agent_execution(self, pipeline_run_id: int, agent_name: str, 
@@ -283,27 +590,27 @@ class DatabaseManager:
                              max_retries: int = 3) -> int:
         """Create agent execution record"""
         try:
-            with self.get_connection() as conn:
+            with self._write_transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO agent_executions 
-                    (pipeline_run_id, agent_name, agent_type, input_data, max_retries)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
+                    (pipeline_run_id, agent_name, agent_type, input_data, max_retries, started_at_ts)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """ + RETURNING_ID, (
                     pipeline_run_id, 
                     agent_name, 
                     agent_type,
-                    json.dumps(input_data), 
-                    max_retries
+                    _dumps(input_data) if input_data else EMPTY_JSON_OBJECT, 
+                    max_retries,
+                    int(time.time())
                 ))
                 
-                execution_id = cursor.lastrowid
-                conn.commit()
-                logger.info(f"Created agent execution {execution_id} for {agent_name}")
+                execution_id = self._inserted_id(cursor)
+                logger.debug("Created agent execution %s for %s", execution_id, agent_name)
                 return execution_id
                 
         except Exception as e:
-            logger.error(f"Failed to create agent execution: {e}")
+            logger.error("Failed to create agent execution: %s", e)
             raise
     
     def update_agent_execution(self, execution_id: int, status: str, 
@@ -312,24 +619,28 @@ class DatabaseManager:
                              increment_retry: bool = False):
         """Update agent execution results"""
         try:
-            with self.get_connection() as conn:
+            with self._write_transaction() as conn:
                 cursor = conn.cursor()
                 
                 update_fields = ["status = ?"]
                 params = [status]
+                now = int(time.time())
                 
                 if status == 'running':
-                    update_fields.append("started_at = CURRENT_TIMESTAMP")
+                    update_fields.extend(["started_at = CURRENT_TIMESTAMP", "started_at_ts = ?"])
+                    params.append(now)
                 
                 if status in ['completed', 'failed']:
                     update_fields.extend([
                         "completed_at = CURRENT_TIMESTAMP",
-                        "duration_seconds = (julianday(CURRENT_TIMESTAMP) - julianday(started_at)) * 86400"
+                        "completed_at_ts = ?",
+                        "duration_seconds = ? - started_at_ts"
                     ])
+                    params.extend([now, now])
                 
                 if output_data:
                     update_fields.append("output_data = ?")
-                    params.append(json.dumps(output_data))
+                    params.append(_encode(output_data))
                 
                 if error_message:
                     update_fields.append("error_message = ?")
@@ -346,43 +657,50 @@ class DatabaseManager:
                     WHERE id = ?
                 """, params)
                 
-                conn.commit()
-                logger.info(f"Updated agent execution {execution_id} status to {status}")
+                logger.debug("Updated agent execution %s status to %s", execution_id, status)
                 
         except Exception as e:
-            logger.error(f"Failed to update agent execution: {e}")
+            logger.error("Failed to update agent execution: %s", e)
             raise
     
     def add_security_finding(self, pipeline_run_id: int, finding: Dict[str, Any],
                            agent_execution_id: Optional[int] = None):
         """Add security finding"""
+        self.add_security_findings_bulk(pipeline_run_id, [finding], agent_execution_id)
+    
+    def add_security_findings_bulk(self, pipeline_run_id: int, findings: List[Dict[str, Any]],
+                                 agent_execution_id: Optional[int] = None):
+        """Add many security findings in a single transaction"""
+        rows = [
+            (
+                pipeline_run_id,
+                agent_execution_id,
+                finding.get('severity', 'medium'),
+                finding.get('category', 'unknown'),
+                finding.get('title', ''),
+                finding.get('description', ''),
+                finding.get('file_path', ''),
+                finding.get('line_number', 0),
+                finding.get('column_number', 0),
+                finding.get('rule_id', ''),
+                finding.get('remediation', '')
+            )
+            for finding in findings
+        ]
+        
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
+            with self._write_transaction() as conn:
+                conn.executemany("""
                     INSERT INTO security_findings 
                     (pipeline_run_id, agent_execution_id, severity, category, title, 
                      description, file_path, line_number, column_number, rule_id, remediation)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    pipeline_run_id,
-                    agent_execution_id,
-                    finding.get('severity', 'medium'),
-                    finding.get('category', 'unknown'),
-                    finding.get('title', ''),
-                    finding.get('description', ''),
-                    finding.get('file_path', ''),
-                    finding.get('line_number', 0),
-                    finding.get('column_number', 0),
-                    finding.get('rule_id', ''),
-                    finding.get('remediation', '')
-                ))
+                """, rows)
                 
-                conn.commit()
-                logger.info(f"Added security finding for pipeline {pipeline_run_id}")
+                logger.debug("Added %d security finding(s) for pipeline %s", len(rows), pipeline_run_id)
                 
         except Exception as e:
-            logger.error(f"Failed to add security finding: {e}")
+            logger.error("Failed to add security findings: %s", e)
             raise
     
     def add_performance_metric(self, pipeline_run_id: int, metric_name: str, 
@@ -390,31 +708,66 @@ class DatabaseManager:
                              metric_type: str = "gauge", labels: Dict[str, str] = None,
                              agent_execution_id: Optional[int] = None):
         """Add performance metric"""
+        self.add_performance_metrics_bulk(pipeline_run_id, [{
+            'metric_name': metric_name,
+            'metric_value': metric_value,
+            'metric_unit': metric_unit,
+            'metric_type': metric_type,
+            'labels': labels
+        }], agent_execution_id)
+    
+    def add_performance_metrics_bulk(self, pipeline_run_id: int, metrics: List[Dict[str, Any]],
+                                   agent_execution_id: Optional[int] = None):
+        """Add many performance metrics in a single transaction
+        
+        Each metric is a dict with metric_name and metric_value, plus optional
+        metric_unit, metric_type and labels (same defaults as add_performance_metric).
+        """
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
+            with self._write_transaction() as conn:
+                name_ids = self._resolve_metric_names(conn, {metric['metric_name'] for metric in metrics})
+                
+                conn.executemany("""
                     INSERT INTO performance_metrics 
-                    (pipeline_run_id, agent_execution_id, metric_name, metric_value, 
+                    (pipeline_run_id, agent_execution_id, metric_name_id, metric_value, 
                      metric_unit, metric_type, labels)
                     VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    pipeline_run_id, 
-                    agent_execution_id,
-                    metric_name, 
-                    metric_value, 
-                    metric_unit,
-                    metric_type,
-                    json.dumps(labels or {})
-                ))
-                
-                conn.commit()
-                logger.info(f"Added performance metric {metric_name} for pipeline {pipeline_run_id}")
+                """, [
+                    (
+                        pipeline_run_id,
+                        agent_execution_id,
+                        name_ids[metric['metric_name']],
+                        metric['metric_value'],
+                        metric.get('metric_unit', ""),
+                        metric.get('metric_type', "gauge"),
+                        _dumps(metric['labels']) if metric.get('labels') else EMPTY_JSON_OBJECT
+                    )
+                    for metric in metrics
+                ])
+            
+            # Only cache ids once the transaction that may have created them committed
+            self._metric_name_cache.update(name_ids)
+            
+            logger.debug("Added %d performance metric(s) for pipeline %s", len(metrics), pipeline_run_id)
                 
         except Exception as e:
-            logger.error(f"Failed to add performance metric: {e}")
+            logger.error("Failed to add performance metrics: %s", e)
             raise
     
+    def _resolve_metric_names(self, conn: sqlite3.Connection, names: set) -> Dict[str, int]:
+        """Map metric names to their metric_names ids, registering new ones"""
+        cache = self._metric_name_cache
+        name_ids = {name: cache[name] for name in names if name in cache}
+        
+        for name in names:
+            if name not in name_ids:
+                conn.execute("INSERT OR IGNORE INTO metric_names (name) VALUES (?)", (name,))
+                name_ids[name] = conn.execute(
+                    "SELECT id FROM metric_names WHERE name = ?", (name,)
+                ).fetchone()[0]
+        
+        return name_ids
+    
     def add_build_artifact(self, pipeline_run_id: int, artifact_type: str,
                           artifact_name: str, artifact_path: str,
                           artifact_size: int = 0, artifact_hash: str = "",
@@ -422,7 +775,7 @@ class DatabaseManager:
                           agent_execution_id: Optional[int] = None):
         """Add build artifact"""
         try:
-            with self.get_connection() as conn:
+            with self._write_transaction() as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                     INSERT INTO build_artifacts 
@@ -437,131 +790,135 @@ class DatabaseManager:
                     artifact_path,
                     artifact_size,
                     artifact_hash,
-                    json.dumps(metadata or {})
+                    _dumps(metadata) if metadata else EMPTY_JSON_OBJECT
                 ))
                 
-                conn.commit()
-                logger.info(f"Added build artifact {artifact_name} for pipeline {pipeline_run_id}")
+                logger.debug("Added build artifact %s for pipeline %s", artifact_name, pipeline_run_id)
                 
         except Exception as e:
-            logger.error(f"Failed to add build artifact: {e}")
+            logger.error("Failed to add build artifact: %s", e)
             raise
     
+    def iter_pipeline_history(self, limit: int = 50, status: str = None,
+                              user_id: str = None, batch_size: int = 64) -> Iterator[Dict[str, Any]]:
+        """Yield pipeline execution history with filters, fetching rows in batches
+        
+        Stopping early closes the cursor, so rows that are never consumed are
+        never fetched or decoded.
+        """
+        with self._read_connection() as conn:
+            cursor = conn.cursor()
+            # Plain tuples: the columns are known, so skip building sqlite3.Row objects
+            cursor.row_factory = None
+            cursor.arraysize = batch_size
+            
+            query = f"""
+                SELECT {', '.join(HISTORY_COLUMNS)}
+                FROM pipeline_runs 
+            """
+            params = []
+            conditions = []
+            
+            if status:
+                conditions.append("status = ?")
+                params.append(status)
+            
+            if user_id:
+                conditions.append("user_id = ?")
+                params.append(user_id)
+            
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
+            
+            query += " ORDER BY created_at DESC LIMIT ?"
+            params.append(limit)
+            
+            try:
+                cursor.execute(query, params)
+                
+                while True:
+                    rows = cursor.fetchmany()
+                    if not rows:
+                        break
+                    for row in rows:
+                        result = dict(zip(HISTORY_COLUMNS, row))
+                        tags = result['tags']
+                        # Most runs are untagged; only decode when there is something to decode
+                        result['tags'] = json.loads(tags) if tags and tags != EMPTY_JSON_ARRAY else []
+                        yield result
+            finally:
+                cursor.close()
+    
     def get_pipeline_history(self, limit: int = 50, status: str = None,
                            user_id: str = None) -> List[Dict[str, Any]]:
         """Get pipeline execution history with filters"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                query = """
-                    SELECT id, project_name, project_type, status, created_at, 
-                           started_at, completed_at, duration_seconds, user_id, tags
-                    FROM pipeline_runs 
-                """
-                params = []
-                conditions = []
-                
-                if status:
-                    conditions.append("status = ?")
-                    params.append(status)
-                
-                if user_id:
-                    conditions.append("user_id = ?")
-                    params.append(user_id)
-                
-                if conditions:
-                    query += " WHERE " + " AND ".join(conditions)
-                
-                query += " ORDER BY created_at DESC LIMIT ?"
-                params.append(limit)
-                
-                cursor.execute(query, params)
-                rows = cursor.fetchall()
-                
-                results = []
-                for row in rows:
-                    result = dict(row)
-                    result['tags'] = json.loads(result['tags']) if result['tags'] else []
-                    results.append(result)
-                
-                return results
+            return list(self.iter_pipeline_history(limit=limit, status=status, user_id=user_id))
                 
         except Exception as e:
-            logger.error(f"Failed to get pipeline history: {e}")
+            logger.error("Failed to get pipeline history: %s", e)
             return []
     
     def get_security_summary(self, pipeline_run_id: int) -> Dict[str, Any]:
         """Get security findings summary for a pipeline run"""
         try:
-            with self.get_connection() as conn:
+            with self._read_connection() as conn:
                 cursor = conn.cursor()
                 
-                # Get findings by severity
-                cursor.execute("""
-                    SELECT severity, COUNT(*) as count
+                # One pass per run: open/total/false-positive counts and open weight per severity
+                cursor.execute(f"""
+                    SELECT severity,
+                           SUM(status = 'open') as open_count,
+                           COUNT(*) as total_count,
+                           SUM(false_positive = 1) as false_positive_count,
+                           SUM(status = 'open') * {SEVERITY_WEIGHT_SQL} as open_weight
                     FROM security_findings 
-                    WHERE pipeline_run_id = ? AND status = 'open'
+                    WHERE pipeline_run_id = ?
                     GROUP BY severity
                 """, (pipeline_run_id,))
                 
-                findings_by_severity = dict(cursor.fetchall())
-                
-                # Get total counts
-                cursor.execute("""
-                    SELECT 
-                        COUNT(*) as total_findings,
-                        COUNT(CASE WHEN status = 'open' THEN 1 END) as open_findings,
-                        COUNT(CASE WHEN false_positive = 1 THEN 1 END) as false_positives
-                    FROM security_findings 
-                    WHERE pipeline_run_id = ?
-                """, (pipeline_run_id,))
+                findings_by_severity = {}
+                counts = {'total_findings': 0, 'open_findings': 0, 'false_positives': 0}
+                weighted_total = 0
                 
-                counts = dict(cursor.fetchone())
+                for severity, open_count, total_count, false_positive_count, open_weight in cursor.fetchall():
+                    if open_count:
+                        findings_by_severity[severity] = open_count
+                    counts['total_findings'] += total_count
+                    counts['open_findings'] += open_count
+                    counts['false_positives'] += false_positive_count
+                    weighted_total += open_weight
                 
                 return {
                     'findings_by_severity': findings_by_severity,
                     'total_findings': counts['total_findings'],
                     'open_findings': counts['open_findings'],
                     'false_positives': counts['false_positives'],
-                    'security_score': self._calculate_security_score(findings_by_severity)
+                    'security_score': self._calculate_security_score(weighted_total)
                 }
                 
         except Exception as e:
-            logger.error(f"Failed to get security summary: {e}")
+            logger.error("Failed to get security summary: %s", e)
             return {}
     
-    def _calculate_security_score(self, findings_by_severity: Dict[str, int]) -> int:
-        """Calculate security score based on findings"""
-        severity_weights = {'critical': 10, 'high': 5, 'medium': 2, 'low': 1}
-        total_weight = sum(findings_by_severity.get(sev, 0) * weight 
-                          for sev, weight in severity_weights.items())
-        
-        # Score from 0-100, where 100 is perfect (no findings)
-        if total_weight == 0:
-            return 100
-        elif total_weight <= 5:
-            return 90
-        elif total_weight <= 15:
-            return 75
-        elif total_weight <= 30:
-            return 50
-        else:
-            return 25
+    def _calculate_security_score(self, weighted_total: int) -> int:
+        """Map the weighted open-findings total to a 0-100 score (100 means no findings)"""
+        return SECURITY_SCORES[bisect_left(SECURITY_SCORE_THRESHOLDS, weighted_total)]
     
     def get_performance_summary(self, pipeline_run_id: int) -> Dict[str, Any]:
         """Get performance metrics summary"""
         try:
-            with self.get_connection() as conn:
+            with self._read_connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
-                    SELECT metric_name, AVG(metric_value) as avg_value, 
-                           MIN(metric_value) as min_value, MAX(metric_value) as max_value,
-                           metric_unit, COUNT(*) as count
-                    FROM performance_metrics 
-                    WHERE pipeline_run_id = ?
-                    GROUP BY metric_name, metric_unit
+                    SELECT mn.name as metric_name, AVG(pm.metric_value) as avg_value, 
+                           MIN(pm.metric_value) as min_value, MAX(pm.metric_value) as max_value,
+                           pm.metric_unit, COUNT(*) as count
+                    FROM performance_metrics pm
+                    JOIN metric_names mn ON mn.id = pm.metric_name_id
+                    WHERE pm.pipeline_run_id = ?
+                    GROUP BY pm.metric_name_id, pm.metric_unit
                 """, (pipeline_run_id,))
                 
                 metrics = []
@@ -571,46 +928,58 @@ class DatabaseManager:
                 return {'metrics': metrics}
                 
         except Exception as e:
-            logger.error(f"Failed to get performance summary: {e}")
+            logger.error("Failed to get performance summary: %s", e)
             return {'metrics': []}
     
     def cleanup_old_data(self, days_to_keep: int = 30):
         """Clean up old pipeline data"""
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                
+            with self._write_transaction() as conn:
                 # Delete old pipeline runs and related data (CASCADE will handle related tables)
-                cursor.execute("""
+                cursor = conn.execute("""
                     DELETE FROM pipeline_runs 
-                    WHERE created_at < datetime('now', '-{} days')
-                """.format(days_to_keep))
+                    WHERE created_at_ts < ?
+                """, (int(time.time()) - days_to_keep * 86400,))
                 
                 deleted_count = cursor.rowcount
-                conn.commit()
+            
+            with self.get_connection() as conn:
+                # Return the freed pages to the OS. execute() would step this pragma only
+                # once (freeing a single page); executescript runs it to completion
+                conn.executescript("PRAGMA incremental_vacuum;")
+                
+                # Row counts just changed a lot: refresh planner stats and shrink the WAL
+                conn.execute("ANALYZE pipeline_runs")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
                 
-                logger.info(f"Cleaned up {deleted_count} old pipeline runs")
+                logger.info("Cleaned up %d old pipeline runs", deleted_count)
                 return deleted_count
                 
         except Exception as e:
-            logger.error(f"Failed to cleanup old data: {e}")
+            logger.error("Failed to cleanup old data: %s", e)
             return 0
     
+    def optimize(self):
+        """Refresh query planner statistics where SQLite judges them stale
+        
+        Cheap when nothing changed; meant to be called at startup and then
+        periodically (e.g. every 15 minutes) by long-running processes.
+        """
+        try:
+            with self.get_connection() as conn:
+                conn.execute("PRAGMA optimize")
+        except Exception as e:
+            logger.error("Failed to optimize database: %s", e)
+    
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
-            with self.get_connection() as conn:
+            with self._read_connection() as conn:
                 cursor = conn.cursor()
                 
-                stats = {}
-                
-                # Table counts
-                tables = ['pipeline_runs', 'agent_executions', 'security_findings', 
-                         'performance_metrics', 'build_artifacts', 'deployment_history']
-                
-                for table in tables:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table}")
-                    stats[f"{table}_count"] = cursor.fetchone()[0]
+                # Table counts, all in one statement
+                cursor.execute(TABLE_COUNTS_SQL)
+                stats = {f"{table}_count": count for table, count in cursor.fetchall()}
                 
                 # Database size
                 cursor.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
@@ -619,5 +988,5 @@ class DatabaseManager:
                 return stats
                 
         except Exception as e:
-            logger.error(f"Failed to get database stats: {e}")
+            logger.error("Failed to get database stats: %s", e)
             return {}
@@ -2,88 +2,388 @@
 Database optimization utilities for VedOps
 """
 
+import os
 import sqlite3
+import queue
+import re
 import threading
 import logging
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Iterable, FrozenSet
 from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from urllib.request import pathname2url
 import time
-from .performance import profile, cached
+import weakref
+from collections import OrderedDict, defaultdict
+from .performance import profile
 
 logger = logging.getLogger(__name__)
 
+# Seconds between PRAGMA optimize runs on a pooled connection
+OPTIMIZE_INTERVAL = 900
+
+# Rows per executemany call in execute_batch; bounds how much one step adds to the WAL
+BATCH_CHUNK_SIZE = 10000
+
+# SQLite's default cap on terms in one compound SELECT (SQLITE_MAX_COMPOUND_SELECT)
+MAX_COMPOUND_SELECT = 500
+
+# Rows ANALYZE samples per index when analyze_performance refreshes its row estimates
+ANALYSIS_LIMIT = 1000
+
+# Prepared statements kept per connection; sqlite3 reuses them for repeated query text
+# instead of re-parsing. Sized above the default 128 for dashboards replaying many queries
+STATEMENT_CACHE_SIZE = 256
+
+# Applied to every pooled connection in one script. auto_vacuum lets optimize_database
+# reclaim pages incrementally; it only takes effect on a new database, so it must precede
+# the WAL switch. The larger checkpoint interval keeps write bursts from stalling on WAL copies
+INIT_PRAGMAS = """
+PRAGMA auto_vacuum=INCREMENTAL;
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA cache_size=-65536;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA foreign_keys=ON;
+PRAGMA wal_autocheckpoint=10000;
+"""
+
+# Pooled read-only connections: only per-connection settings, nothing that writes the file
+READ_PRAGMAS = """
+PRAGMA cache_size=-65536;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA query_only=ON;
+"""
+
+# Table, column and index names accepted by _quote_ident
+IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+# Table named after FROM/JOIN (reads) or INTO/UPDATE (writes); DELETE uses FROM too
+TABLE_REFERENCE_PATTERN = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+["`\[]?([A-Za-z_][A-Za-z0-9_]*)', re.IGNORECASE)
+
+# Statements that may run on a read-only pooled connection. A WITH clause can also front
+# an INSERT/UPDATE/DELETE, so CTE queries only count when no DML keyword follows
+READ_STATEMENT_PATTERN = re.compile(r'^\s*(?:SELECT\b|WITH\b(?!.*\b(?:INSERT|UPDATE|DELETE|REPLACE)\b))', re.IGNORECASE | re.DOTALL)
+
+# Statements executemany accepts; anything else (SELECT, DDL, PRAGMA) must use execute
+DML_STATEMENT_PATTERN = re.compile(r'^\s*(?:INSERT|UPDATE|DELETE|REPLACE)\b', re.IGNORECASE)
+
+def _is_read_only(query: str) -> bool:
+    """Whether a query is a pure SELECT/WITH that never writes"""
+    return READ_STATEMENT_PATTERN.match(query) is not None
+
+def _referenced_tables(query: str) -> FrozenSet[str]:
+    """Lower-cased names of the tables a query reads or writes"""
+    return frozenset(name.lower() for name in TABLE_REFERENCE_PATTERN.findall(query))
+
+def _quote_ident(name: str) -> str:
+    """Validate a table/column/index name and return it double-quoted for SQL"""
+    if not isinstance(name, str) or not IDENTIFIER_PATTERN.match(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return f'"{name}"'
+
+def _quote_index_columns(columns: str) -> str:
+    """Quote a comma-separated index column list, keeping optional ASC/DESC"""
+    quoted = []
+    for column in columns.split(','):
+        parts = column.split()
+        if len(parts) == 2 and parts[1].upper() in ('ASC', 'DESC'):
+            quoted.append(f"{_quote_ident(parts[0])} {parts[1].upper()}")
+        elif len(parts) == 1:
+            quoted.append(_quote_ident(parts[0]))
+        else:
+            raise ValueError(f"Invalid index column: {column.strip()!r}")
+    return ", ".join(quoted)
+
+class QueryCache:
+    """Bounded LRU cache of query results with a TTL
+    
+    Concurrent misses for the same key collapse into one load: the first
+    caller runs it while the others wait and then read its result.
+    
+    Entries also record the version of each table they read; a write that
+    calls bump_tables makes them stale at once. The TTL remains as a bound
+    for writes made outside this cache's owner (e.g. DatabaseManager).
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (result, expires_at, {table: version})
+        self.table_versions = defaultdict(int)
+        self.lock = threading.Lock()
+        # Held only while a key is being loaded; dropped once nobody waits on it
+        self.key_locks = weakref.WeakValueDictionary()
+    
+    def _lookup(self, key: tuple) -> Any:
+        """Return a live entry's result, or _MISSING; caller holds self.lock"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return self._MISSING
+        
+        if entry[1] <= time.monotonic() or any(
+            self.table_versions[table] != version for table, version in entry[2].items()
+        ):
+            del self.entries[key]
+            return self._MISSING
+        
+        self.entries.move_to_end(key)
+        return entry[0]
+    
+    def get_or_load(self, key: tuple, loader: Callable[[], Any], tables: Iterable[str] = ()) -> Any:
+        """Return the cached result for key, calling loader on a miss
+        
+        tables names what the loader reads, so writes to them invalidate the entry.
+        """
+        with self.lock:
+            result = self._lookup(key)
+            if result is not self._MISSING:
+                return result
+            
+            key_lock = self.key_locks.get(key)
+            if key_lock is None:
+                key_lock = self.key_locks[key] = threading.Lock()
+        
+        with key_lock:
+            # Another caller may have loaded it while we waited
+            with self.lock:
+                result = self._lookup(key)
+                if result is not self._MISSING:
+                    return result
+                # Taken before loading, so a write that lands mid-load still invalidates
+                versions = {table: self.table_versions[table] for table in tables}
+            
+            result = loader()
+            
+            with self.lock:
+                self.entries[key] = (result, time.monotonic() + self.ttl, versions)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        
+        return result
+    
+    def bump_tables(self, tables: Iterable[str]):
+        """Record a committed write to tables; entries that read them go stale"""
+        with self.lock:
+            for table in tables:
+                self.table_versions[table] += 1
+    
+    def invalidate(self, prefix: str = "") -> int:
+        """Drop entries whose query starts with prefix (all entries by default)"""
+        with self.lock:
+            stale = [key for key in self.entries if key[0].startswith(prefix)]
+            for key in stale:
+                del self.entries[key]
+        
+        return len(stale)
+
 class DatabaseOptimizer:
-    """Database performance optimization utilities"""
+    """Database performance optimization utilities
+    
+    Each instance owns a writer thread and a connection pool until
+    close_all_connections; use shared() rather than one instance per caller.
+    """
+    
+    # One live optimizer per database file, handed out by shared()
+    _shared: Dict[str, "DatabaseOptimizer"] = {}
+    _shared_lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls, db_path: str) -> "DatabaseOptimizer":
+        """Return the process-wide optimizer for db_path, creating it on first use"""
+        key = db_path if db_path == ':memory:' else os.path.abspath(db_path)
+        with cls._shared_lock:
+            optimizer = cls._shared.get(key)
+            if optimizer is None or optimizer._closed:
+                optimizer = cls._shared[key] = cls(db_path)
+            return optimizer
     
     def __init__(self, db_path: str):
         self.db_path = db_path
-        self.connection_pool = []
-        self.pool_lock = threading.Lock()
         self.max_connections = 10
-        self.query_cache = {}
-        self.cache_lock = threading.Lock()
+        self.pool_timeout = 30.0
+        # LIFO hands out the most recently used connection, whose page cache is warmest
+        self.connection_pool = queue.LifoQueue(maxsize=self.max_connections)
+        self.query_cache = QueryCache(maxsize=1024, ttl=300)
+        # EXPLAIN QUERY PLAN output; only ANALYZE or schema changes alter it
+        self.plan_cache = QueryCache(maxsize=256, ttl=float('inf'))
+        # Bumped with every plan_cache invalidation; see get_query_plan
+        self.plan_generation = 0
+        
+        # Every write runs on one connection owned by the writer thread, so writers never
+        # race each other for SQLite's write lock and the pool only ever reads
+        self._writer_conn = self._create_optimized_connection()
+        # When the writer connection last ran PRAGMA optimize
+        self.last_optimized = time.monotonic()
+        self._write_queue = queue.Queue()  # (work, Future, transaction) jobs; None stops the thread
+        # Set by close_all_connections; guarded with _write_lock so no job lands after the stop sentinel
+        self._closed = False
+        self._write_lock = threading.Lock()
+        self._writer_thread = threading.Thread(
+            target=self._run_writer, name="DatabaseOptimizerWriter", daemon=True
+        )
+        self._writer_thread.start()
         
         # Initialize connection pool
         self._initialize_pool()
     
     def _initialize_pool(self):
         """Initialize database connection pool"""
-        with self.pool_lock:
-            for _ in range(self.max_connections):
-                conn = self._create_optimized_connection()
-                self.connection_pool.append(conn)
+        for _ in range(self.max_connections):
+            self.connection_pool.put_nowait(self._create_optimized_connection(read_only=True))
     
-    def _create_optimized_connection(self) -> sqlite3.Connection:
-        """Create optimized database connection"""
+    def _create_optimized_connection(self, read_only: bool = False) -> sqlite3.Connection:
+        """Create optimized database connection
+        
+        Read-only connections are opened with mode=ro and query_only, so a
+        write that bypasses the writer thread fails instead of contending.
+        """
+        # A second handle on :memory: opens a different, empty database, so it stays read-write
+        if read_only and self.db_path != ':memory:':
+            conn = sqlite3.connect(
+                f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro",
+                uri=True,
+                timeout=30.0,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                isolation_level=None
+            )
+            conn.executescript(READ_PRAGMAS)
+            conn.row_factory = sqlite3.Row
+            return conn
+        
         conn = sqlite3.connect(
             self.db_path,
             timeout=30.0,
             check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
             isolation_level=None  # Autocommit mode
         )
         
-        # Enable WAL mode for better concurrency
-        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(INIT_PRAGMAS)
         
-        # Optimize for performance
-        conn.execute("PRAGMA synchronous=NORMAL")
-        conn.execute("PRAGMA cache_size=10000")
-        conn.execute("PRAGMA temp_store=MEMORY")
-        conn.execute("PRAGMA mmap_size=268435456")  # 256MB
-        
-        # Enable foreign keys
-        conn.execute("PRAGMA foreign_keys=ON")
+        # journal_mode silently stays put where WAL is unsupported (e.g. in-memory databases)
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if journal_mode != 'wal':
+            logger.warning(f"Database is using {journal_mode} journal mode instead of WAL")
         
         conn.row_factory = sqlite3.Row
         return conn
     
     @contextmanager
     def get_connection(self):
-        """Get optimized database connection from pool"""
-        conn = None
+        """Get a read-only database connection from pool, waiting for one to be returned"""
+        # close_all_connections drains the pool, so a get() would only wait out pool_timeout
+        if self._closed:
+            raise RuntimeError("DatabaseOptimizer is closed")
+        
+        try:
+            conn = self.connection_pool.get(timeout=self.pool_timeout)
+        except queue.Empty:
+            if self._closed:
+                raise RuntimeError("DatabaseOptimizer is closed")
+            raise TimeoutError("Database connection pool timeout")
+        
         try:
-            with self.pool_lock:
-                if self.connection_pool:
-                    conn = self.connection_pool.pop()
-                else:
-                    conn = self._create_optimized_connection()
-            
             yield conn
-            
         finally:
-            if conn:
-                with self.pool_lock:
-                    if len(self.connection_pool) < self.max_connections:
-                        self.connection_pool.append(conn)
-                    else:
-                        conn.close()
+            # Checked under the lock close_all_connections sets _closed with, so a
+            # connection is either returned before the pool is drained or closed here
+            with self._write_lock:
+                closed = self._closed
+                if not closed:
+                    self.connection_pool.put_nowait(conn)
+            if closed:
+                self._safe_close(conn)
+    
+    def _run_writer(self):
+        """Writer thread: run queued write jobs one at a time on the writer connection"""
+        conn = self._writer_conn
+        
+        while True:
+            job = self._write_queue.get()
+            if job is None:
+                break
+            
+            work, future, transaction = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            
+            try:
+                if transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        result = work(conn)
+                        conn.execute("COMMIT")
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                else:
+                    result = work(conn)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            
+            # Keep planner statistics fresh on long-running processes
+            if time.monotonic() - self.last_optimized > OPTIMIZE_INTERVAL:
+                try:
+                    conn.execute("PRAGMA optimize")
+                except Exception as e:
+                    logger.warning(f"PRAGMA optimize failed: {e}")
+                self.last_optimized = time.monotonic()
+    
+    def _submit_write(self, work: Callable[[sqlite3.Connection], Any], transaction: bool = True) -> Any:
+        """Run work(conn) on the writer thread, inside BEGIN IMMEDIATE/COMMIT unless
+        transaction is False, and return its result or raise its exception"""
+        future = Future()
+        with self._write_lock:
+            if self._closed:
+                raise RuntimeError("DatabaseOptimizer is closed")
+            self._write_queue.put((work, future, transaction))
+        return future.result()
+    
+    def _invalidate_plans(self):
+        """Drop cached query plans after a change that can alter the planner's choices"""
+        self.plan_generation += 1
+        self.plan_cache.invalidate()
+    
+    def _note_write(self, queries: Iterable[str]):
+        """Invalidate cached results that read the tables these committed writes touched"""
+        tables = set()
+        for query in queries:
+            written = _referenced_tables(query)
+            if not written:
+                # Can't tell what changed (DDL, unusual syntax): drop everything
+                self.query_cache.invalidate()
+                self._invalidate_plans()
+                return
+            tables |= written
+        
+        self.query_cache.bump_tables(tables)
     
     @profile("database_query")
     def execute_query(self, query: str, params: tuple = None, 
-                     fetch_one: bool = False, fetch_all: bool = True) -> Any:
-        """Execute optimized database query"""
-        with self.get_connection() as conn:
+                     fetch_one: bool = False, fetch_all: bool = True,
+                     as_dicts: bool = False) -> Any:
+        """Execute optimized database query
+        
+        Pure SELECT/WITH queries run on a pooled read-only connection; every
+        other statement goes to the writer thread, which returns the fetched
+        rows (e.g. INSERT ... RETURNING) just the same. With neither fetch_one
+        nor fetch_all the affected row count is returned. as_dicts returns
+        fetch_all rows as plain dicts instead of sqlite3.Row.
+        """
+        def run(conn: sqlite3.Connection) -> Any:
             cursor = conn.cursor()
+            if as_dicts:
+                # Plain tuples, zipped below with column names read once per query
+                cursor.row_factory = None
             
             start_time = time.perf_counter()
             cursor.execute(query, params or ())
@@ -92,6 +392,9 @@ class DatabaseOptimizer:
                 result = cursor.fetchone()
             elif fetch_all:
                 result = cursor.fetchall()
+                if as_dicts and result:
+                    columns = tuple(column[0] for column in cursor.description)
+                    result = [dict(zip(columns, row)) for row in result]
             else:
                 result = cursor.rowcount
             
@@ -102,41 +405,83 @@ class DatabaseOptimizer:
                 logger.warning(f"Slow query ({duration:.2f}s): {query[:100]}...")
             
             return result
+        
+        if _is_read_only(query):
+            with self.get_connection() as conn:
+                return run(conn)
+        
+        result = self._submit_write(run)
+        self._note_write([query])
+        return result
     
-    @cached(ttl=300)  # Cache for 5 minutes
     def execute_cached_query(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        """Execute query with caching for read-only operations"""
-        result = self.execute_query(query, params, fetch_all=True)
-        return [dict(row) for row in result] if result else []
+        """Execute query with caching for read-only operations
+        
+        Results live up to 5 minutes, or until a write through this optimizer
+        touches one of the tables the query reads.
+        """
+        def load():
+            return self.execute_query(query, params, fetch_all=True, as_dicts=True)
+        
+        return self.query_cache.get_or_load(
+            (query.strip(), tuple(params or ())), load, _referenced_tables(query)
+        )
     
     def execute_batch(self, query: str, param_list: List[tuple]) -> int:
-        """Execute batch operations efficiently"""
-        with self.get_connection() as conn:
+        """Execute batch operations efficiently
+        
+        All rows go in one BEGIN IMMEDIATE transaction on the writer thread,
+        so the batch costs a single commit instead of one per row.
+        """
+        def run(conn: sqlite3.Connection) -> int:
             cursor = conn.cursor()
-            cursor.executemany(query, param_list)
-            return cursor.rowcount
+            rowcount = 0
+            
+            for i in range(0, len(param_list), BATCH_CHUNK_SIZE):
+                cursor.executemany(query, param_list[i:i + BATCH_CHUNK_SIZE])
+                rowcount += cursor.rowcount
+            
+            return rowcount
+        
+        rowcount = self._submit_write(run)
+        self._note_write([query])
+        return rowcount
     
     def execute_transaction(self, operations: List[Dict[str, Any]]) -> bool:
-        """Execute multiple operations in a transaction"""
-        with self.get_connection() as conn:
-            try:
-                conn.execute("BEGIN TRANSACTION")
-                
-                for op in operations:
-                    query = op['query']
-                    params = op.get('params', ())
-                    conn.execute(query, params)
-                
-                conn.execute("COMMIT")
-                return True
-                
-            except Exception as e:
-                conn.execute("ROLLBACK")
-                logger.error(f"Transaction failed: {e}")
-                raise
+        """Execute multiple operations in a transaction
+        
+        The writer thread wraps them in BEGIN IMMEDIATE, so the write lock is
+        held from the start and a failure rolls back before any work is kept.
+        """
+        def run(conn: sqlite3.Connection):
+            cursor = conn.cursor()
+            queries = {op['query'] for op in operations}
+            
+            if len(operations) > 1 and len(queries) == 1 and DML_STATEMENT_PATTERN.match(next(iter(queries))):
+                # Same DML statement throughout: one executemany steps it without re-entering Python per row
+                cursor.executemany(queries.pop(), [op.get('params', ()) for op in operations])
+                return
+            
+            for op in operations:
+                query = op['query']
+                params = op.get('params', ())
+                cursor.execute(query, params)
+        
+        try:
+            self._submit_write(run)
+            self._note_write(op['query'] for op in operations)
+            return True
+        
+        except Exception as e:
+            logger.error(f"Transaction failed: {e}")
+            raise
     
-    def analyze_performance(self) -> Dict[str, Any]:
-        """Analyze database performance"""
+    def analyze_performance(self, exact: bool = False) -> Dict[str, Any]:
+        """Analyze database performance
+        
+        Row counts are estimates from a sampled ANALYZE (table_stats_estimated
+        is True) unless exact is set, which scans every table with COUNT(*).
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
@@ -152,18 +497,15 @@ class DatabaseOptimizer:
             
             # Get table stats
             cursor.execute("""
-                SELECT name, COUNT(*) as row_count 
-                FROM sqlite_master 
+                SELECT name FROM sqlite_master
                 WHERE type='table' AND name NOT LIKE 'sqlite_%'
             """)
-            tables = cursor.fetchall()
+            table_names = [row[0] for row in cursor.fetchall()]
             
-            table_stats = {}
-            for table in tables:
-                table_name = table[0]
-                cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
-                row_count = cursor.fetchone()[0]
-                table_stats[table_name] = row_count
+            if exact:
+                table_stats = self._count_rows(cursor, table_names)
+            else:
+                table_stats = self._estimate_row_counts(cursor, table_names)
             
             return {
                 'database_size_mb': (page_count * page_size) / (1024 * 1024),
@@ -171,88 +513,177 @@ class DatabaseOptimizer:
                 'page_size': page_size,
                 'cache_size': cache_size,
                 'table_stats': table_stats,
-                'connection_pool_size': len(self.connection_pool)
+                'table_stats_estimated': not exact,
+                'connection_pool_size': self.connection_pool.qsize()
             }
     
+    def _count_rows(self, cursor: sqlite3.Cursor, table_names: List[str]) -> Dict[str, int]:
+        """Count every table's rows exactly, one UNION ALL statement per MAX_COMPOUND_SELECT tables"""
+        table_stats = {}
+        for i in range(0, len(table_names), MAX_COMPOUND_SELECT):
+            chunk = table_names[i:i + MAX_COMPOUND_SELECT]
+            query = " UNION ALL ".join(
+                f"SELECT ? AS name, COUNT(*) AS row_count FROM {_quote_ident(name)}" for name in chunk
+            )
+            cursor.execute(query, chunk)
+            table_stats.update(cursor.fetchall())
+        
+        return table_stats
+    
+    def _estimate_row_counts(self, cursor: sqlite3.Cursor, table_names: List[str]) -> Dict[str, int]:
+        """Approximate row counts from a fresh, sampled ANALYZE
+        
+        Stats left by an earlier ANALYZE go stale as rows change, so they are
+        refreshed first; analysis_limit keeps that to a bounded sample per index.
+        """
+        # The pooled connection is read-only; autocommit reads see the writer's result
+        self._submit_write(self._sampled_analyze, transaction=False)
+        self._invalidate_plans()
+        
+        # The first token of stat is the row estimate; indexes repeat it, so take any one per table
+        cursor.execute("SELECT tbl, stat FROM sqlite_stat1")
+        estimates = {tbl: int(stat.split()[0]) for tbl, stat in cursor.fetchall() if stat}
+        
+        # ANALYZE records nothing for empty tables; counting those is cheap and exact
+        missing = [name for name in table_names if name not in estimates]
+        if missing:
+            estimates.update(self._count_rows(cursor, missing))
+        
+        return {name: estimates[name] for name in table_names}
+    
+    @staticmethod
+    def _sampled_analyze(conn: sqlite3.Connection):
+        """ANALYZE reading at most ANALYSIS_LIMIT rows per index"""
+        conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+        try:
+            conn.execute("ANALYZE")
+        finally:
+            # optimize_database's ANALYZE keeps scanning in full
+            conn.execute("PRAGMA analysis_limit=0")
+    
     def optimize_database(self) -> Dict[str, Any]:
-        """Run database optimization operations"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            start_time = time.perf_counter()
-            
-            # Analyze tables
-            cursor.execute("ANALYZE")
-            
-            # Vacuum database
-            cursor.execute("VACUUM")
-            
-            # Reindex
-            cursor.execute("REINDEX")
-            
-            duration = time.perf_counter() - start_time
-            
-            logger.info(f"Database optimization completed in {duration:.2f}s")
-            
-            return {
-                'optimization_duration': duration,
-                'operations': ['ANALYZE', 'VACUUM', 'REINDEX']
-            }
+        """Run database optimization operations on the writer thread"""
+        result = self._submit_write(self._optimize, transaction=False)
+        # Fresh statistics can change the planner's choices
+        self._invalidate_plans()
+        return result
+    
+    def _optimize(self, conn: sqlite3.Connection) -> Dict[str, Any]:
+        """Body of optimize_database; executescript commits, so it runs outside BEGIN"""
+        cursor = conn.cursor()
+        
+        start_time = time.perf_counter()
+        
+        # Analyze tables
+        cursor.execute("ANALYZE")
+        
+        # Return free pages to the OS without rewriting every table. execute() would
+        # step this pragma only once (freeing a single page); executescript runs it through
+        conn.executescript("PRAGMA incremental_vacuum;")
+        
+        duration = time.perf_counter() - start_time
+        
+        logger.info(f"Database optimization completed in {duration:.2f}s")
+        
+        return {
+            'optimization_duration': duration,
+            'operations': ['ANALYZE', 'INCREMENTAL_VACUUM']
+        }
     
     def create_indexes(self, index_definitions: List[Dict[str, str]]):
         """Create database indexes for performance"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
+        self._submit_write(lambda conn: self._create_indexes(conn, index_definitions), transaction=False)
+        self._invalidate_plans()
+    
+    def _create_indexes(self, conn: sqlite3.Connection, index_definitions: List[Dict[str, str]]):
+        """Body of create_indexes; each index commits on its own so one failure keeps the rest"""
+        cursor = conn.cursor()
+        
+        for index_def in index_definitions:
+            index_name = index_def['name']
+            table_name = index_def['table']
+            columns = index_def['columns']
+            unique = index_def.get('unique', False)
             
-            for index_def in index_definitions:
-                index_name = index_def['name']
-                table_name = index_def['table']
-                columns = index_def['columns']
-                unique = index_def.get('unique', False)
-                
-                unique_clause = "UNIQUE " if unique else ""
+            unique_clause = "UNIQUE " if unique else ""
+            
+            try:
+                cursor.execute(f"""
+                    CREATE {unique_clause}INDEX IF NOT EXISTS {_quote_ident(index_name)} 
+                    ON {_quote_ident(table_name)} ({_quote_index_columns(columns)})
+                """)
+                logger.info(f"Created index {index_name} on {table_name}({columns})")
                 
-                try:
-                    cursor.execute(f"""
-                        CREATE {unique_clause}INDEX IF NOT EXISTS {index_name} 
-                        ON {table_name} ({columns})
-                    """)
-                    logger.info(f"Created index {index_name} on {table_name}({columns})")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to create index {index_name}: {e}")
+            except Exception as e:
+                logger.error(f"Failed to create index {index_name}: {e}")
     
     def get_query_plan(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        """Get query execution plan for optimization"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            explain_query = f"EXPLAIN QUERY PLAN {query}"
-            cursor.execute(explain_query, params or ())
-            
-            plan = cursor.fetchall()
-            return [dict(row) for row in plan]
+        """Get query execution plan for optimization
+        
+        Plans are cached per whitespace-normalized query and parameter types,
+        since the plan rarely depends on the parameter values themselves.
+        """
+        def load():
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                # EXPLAIN plans against the connection's last-read schema, and a prepared
+                # EXPLAIN is never re-prepared. A real read reloads the schema, and the
+                # generation comment keeps sqlite3's statement cache from reusing an
+                # EXPLAIN prepared before the last invalidation
+                cursor.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+                
+                explain_query = f"/* plan {self.plan_generation} */ EXPLAIN QUERY PLAN {query}"
+                cursor.execute(explain_query, params or ())
+                
+                plan = cursor.fetchall()
+                return [dict(row) for row in plan]
+        
+        key = (re.sub(r'\s+', ' ', query).strip(), tuple(type(p).__name__ for p in (params or ())))
+        return self.plan_cache.get_or_load(key, load)
     
     def cleanup_old_data(self, table_name: str, date_column: str, 
                         days_to_keep: int) -> int:
         """Cleanup old data efficiently"""
         query = f"""
-            DELETE FROM {table_name} 
-            WHERE {date_column} < datetime('now', '-{days_to_keep} days')
+            DELETE FROM {_quote_ident(table_name)} 
+            WHERE {_quote_ident(date_column)} < datetime('now', ?)
         """
         
-        result = self.execute_query(query, fetch_all=False)
+        result = self.execute_query(query, (f'-{int(days_to_keep)} days',), fetch_all=False)
         logger.info(f"Cleaned up {result} old records from {table_name}")
         
         return result
     
     def close_all_connections(self):
-        """Close all connections in pool"""
-        with self.pool_lock:
-            for conn in self.connection_pool:
-                try:
-                    conn.close()
-                except Exception as e:
-                    logger.error(f"Error closing connection: {e}")
-            
-            self.connection_pool.clear()
+        """Stop the writer thread and close all connections"""
+        with self._write_lock:
+            if self._closed:
+                return
+            self._closed = True
+            # Jobs already queued run before the sentinel
+            self._write_queue.put(None)
+        self._writer_thread.join()
+        
+        with DatabaseOptimizer._shared_lock:
+            for key, optimizer in list(DatabaseOptimizer._shared.items()):
+                if optimizer is self:
+                    del DatabaseOptimizer._shared[key]
+        
+        connections = [self._writer_conn]
+        while True:
+            try:
+                connections.append(self.connection_pool.get_nowait())
+            except queue.Empty:
+                break
+        
+        # Closing the last connection checkpoints the WAL; the rest shouldn't queue behind it
+        with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+            list(executor.map(self._safe_close, connections))
+    
+    @staticmethod
+    def _safe_close(conn: sqlite3.Connection):
+        """Close a connection, logging rather than raising on failure"""
+        try:
+            conn.close()
+        except Exception as e:
+            logger.error(f"Error closing connection: {e}")
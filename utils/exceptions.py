@@ -2,6 +2,10 @@
 Custom exceptions for VedOps with detailed error context
 """
 
+import datetime
+import functools
+import time
+
 class VedOpsException(Exception):
     """Base exception for all VedOps errors"""
     
@@ -10,10 +14,13 @@ class VedOpsException(Exception):
         self.message = message
         self.error_code = error_code or "VEDOPS_ERROR"
         self.context = context or {}
-        self.timestamp = None
-        
-        import datetime
-        self.timestamp = datetime.datetime.now().isoformat()
+        # Only the raw clock is read here; most exceptions are caught without the ISO string ever being used
+        self.created_at = time.time()
+    
+    @functools.cached_property
+    def timestamp(self) -> str:
+        """ISO-8601 time the exception was created"""
+        return datetime.datetime.fromtimestamp(self.created_at).isoformat()
 
 class AgentExecutionError(VedOpsException):
     """Raised when an agent fails to execute"""
@@ -22,7 +29,7 @@ class AgentExecutionError(VedOpsException):
         super().__init__(
             message=f"Agent {agent_name} execution failed: {message}",
             error_code="AGENT_EXECUTION_ERROR",
-            context={**(context or {}), "agent_name": agent_name}
+            context=(context or {}) | {"agent_name": agent_name}
         )
         self.agent_name = agent_name
 
@@ -33,7 +40,7 @@ class ToolIntegrationError(VedOpsException):
         super().__init__(
             message=f"Tool integration failed for {tool_name}: {message}",
             error_code="TOOL_INTEGRATION_ERROR", 
-            context={**(context or {}), "tool_name": tool_name}
+            context=(context or {}) | {"tool_name": tool_name}
         )
         self.tool_name = tool_name
 
@@ -44,7 +51,7 @@ class PipelineExecutionError(VedOpsException):
         super().__init__(
             message=f"Pipeline failed at stage {stage}: {message}",
             error_code="PIPELINE_EXECUTION_ERROR",
-            context={**(context or {}), "stage": stage}
+            context=(context or {}) | {"stage": stage}
         )
         self.stage = stage
 
@@ -55,7 +62,7 @@ class ConfigurationError(VedOpsException):
         super().__init__(
             message=f"Configuration error in {config_type}: {message}",
             error_code="CONFIGURATION_ERROR",
-            context={**(context or {}), "config_type": config_type}
+            context=(context or {}) | {"config_type": config_type}
         )
         self.config_type = config_type
 
@@ -66,7 +73,7 @@ class ResourceExhaustionError(VedOpsException):
         super().__init__(
             message=f"Resource exhaustion ({resource_type}): {message}",
             error_code="RESOURCE_EXHAUSTION_ERROR",
-            context={**(context or {}), "resource_type": resource_type}
+            context=(context or {}) | {"resource_type": resource_type}
         )
         self.resource_type = resource_type
 
@@ -77,7 +84,7 @@ class SecurityViolationError(VedOpsException):
         super().__init__(
             message=f"Security violation ({violation_type}): {message}",
             error_code="SECURITY_VIOLATION_ERROR",
-            context={**(context or {}), "violation_type": violation_type}
+            context=(context or {}) | {"violation_type": violation_type}
         )
         self.violation_type = violation_type
 
@@ -88,7 +95,7 @@ class TimeoutError(VedOpsException):
         super().__init__(
             message=f"Operation {operation} timed out after {timeout_seconds} seconds",
             error_code="TIMEOUT_ERROR",
-            context={**(context or {}), "operation": operation, "timeout_seconds": timeout_seconds}
+            context=(context or {}) | {"operation": operation, "timeout_seconds": timeout_seconds}
         )
         self.operation = operation
         self.timeout_seconds = timeout_seconds
@@ -1,21 +1,198 @@
+import asyncio
+import concurrent.futures
+import importlib
 import json
 import os
-from typing import Dict, Any, Optional
+import sys
+import tempfile
+import hashlib
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple, Callable
+from dataclasses import dataclass
 from datetime import datetime
 import logging
 
+try:
+    import orjson
+except ImportError:  # Optional: faster config (de)serialization
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+def _dumps_config(config: Dict[str, Any]) -> bytes:
+    """Serialize a config for the JSON file compactly; it is written and read by this class only"""
+    if orjson is not None:
+        return orjson.dumps(config)
+    return json.dumps(config, separators=(",", ":")).encode()
+
+def _loads_config(data: bytes) -> Any:
+    """Parse the config file's bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# (module, class name) -> SDK client class, imported on first use
+_CLASS_CACHE: Dict[Tuple[str, str], type] = {}
+
+def _sdk_class(module_path: str, attr: str) -> type:
+    """Import and cache an SDK client class, so only the first call pays for the import"""
+    cls = _CLASS_CACHE.get((module_path, attr))
+    if cls is None:
+        cls = _CLASS_CACHE[(module_path, attr)] = getattr(importlib.import_module(module_path), attr)
+    return cls
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """How get_llm_client builds the client for one provider"""
+    env_names: Tuple[str, ...]
+    factory: Callable[[Dict[str, Any], Optional[str], "ProviderSpec"], Any]
+    sdk: Tuple[str, str]  # (module, class name) of the client class
+    default_base_url: Optional[str] = None
+    
+    def client_class(self) -> type:
+        """The SDK client class, imported only when this provider is used"""
+        return _sdk_class(*self.sdk)
+
+def _resolve_api_key(config: Dict[str, Any], env_names: Tuple[str, ...]) -> Optional[str]:
+    """Resolve API key from environment or config (we avoid persisting secrets)"""
+    for name in env_names:
+        value = os.environ.get(name)
+        if value:
+            return value
+    return config.get('api_key')  # fallback if passed programmatically
+
+# Sampling settings shared by every chat client; agents want near-deterministic output
+_CHAT_KWARGS = {'temperature': 0.1}
+
+# Factories resolve their SDK class through the spec, so only the selected provider's package is loaded
+
+def _openai_client(config: Dict[str, Any], api_key: Optional[str], spec: ProviderSpec):
+    return spec.client_class()(model=config['model'], api_key=api_key, **_CHAT_KWARGS)
+
+def _openai_compatible_client(config: Dict[str, Any], api_key: Optional[str], spec: ProviderSpec):
+    return spec.client_class()(
+        model=config['model'],
+        api_key=api_key,
+        base_url=config.get('endpoint', spec.default_base_url),
+        **_CHAT_KWARGS
+    )
+
+def _anthropic_client(config: Dict[str, Any], api_key: Optional[str], spec: ProviderSpec):
+    return spec.client_class()(model=config['model'], api_key=api_key, **_CHAT_KWARGS)
+
+def _google_client(config: Dict[str, Any], api_key: Optional[str], spec: ProviderSpec):
+    return spec.client_class()(model=config['model'], google_api_key=api_key, **_CHAT_KWARGS)
+
+def _ollama_client(config: Dict[str, Any], api_key: Optional[str], spec: ProviderSpec):
+    return spec.client_class()(model=config['model'], base_url=config.get('ollama_url', spec.default_base_url))
+
+def _azure_openai_client(config: Dict[str, Any], api_key: Optional[str], spec: ProviderSpec):
+    return spec.client_class()(
+        deployment_name=config['model'],
+        api_key=api_key,
+        azure_endpoint=config['endpoint'],
+        api_version="2024-02-15-preview",
+        **_CHAT_KWARGS
+    )
+
+# Providers whose config must carry an endpoint URL
+_ENDPOINT_REQUIRED = frozenset({'Azure OpenAI', 'Custom API'})
+
+# Seconds a connection test may take, and how long its outcome is reused for the same client
+CONNECTION_TEST_TIMEOUT = 3.0
+CONNECTION_TEST_TTL = 60
+
+CONNECTION_TEST_PROMPT = "Hello, this is a connection test."
+
+# Event loop that runs every synchronous connection test. Cached clients keep async HTTP
+# pools bound to the loop they first ran on, so all tests must share one long-lived loop
+_test_loop: Optional[asyncio.AbstractEventLoop] = None
+_test_loop_lock = threading.Lock()
+
+def _connection_test_loop() -> asyncio.AbstractEventLoop:
+    """Return the connection test loop, starting its thread on first use"""
+    global _test_loop
+    with _test_loop_lock:
+        if _test_loop is None:
+            _test_loop = asyncio.new_event_loop()
+            threading.Thread(target=_test_loop.run_forever, name="LLMConnectionTest", daemon=True).start()
+        return _test_loop
+
+# Written by save_config; they don't affect the client, so they are left out of its cache key
+_METADATA_FIELDS = frozenset({'saved_at', 'version'})
+
+# Shared by OpenAI and every OpenAI-compatible provider
+_CHAT_OPENAI = ('langchain_openai', 'ChatOpenAI')
+
+# Provider name -> spec; unknown providers are treated as Custom API (OpenAI-compatible)
+_PROVIDERS: Dict[str, ProviderSpec] = {
+    "OpenAI": ProviderSpec(('OPENAI_API_KEY',), _openai_client, _CHAT_OPENAI),
+    "Anthropic": ProviderSpec(('ANTHROPIC_API_KEY',), _anthropic_client, ('langchain_anthropic', 'ChatAnthropic')),
+    "Google": ProviderSpec(('GOOGLE_API_KEY',), _google_client, ('langchain_google_genai', 'ChatGoogleGenerativeAI')),
+    "Ollama (Local)": ProviderSpec((), _ollama_client, ('langchain_community.llms', 'Ollama'), 'http://localhost:11434'),
+    "Azure OpenAI": ProviderSpec(('AZURE_OPENAI_API_KEY', 'AZURE_API_KEY'), _azure_openai_client, ('langchain_openai', 'AzureChatOpenAI')),
+    "Groq": ProviderSpec(('GROQ_API_KEY',), _openai_compatible_client, _CHAT_OPENAI, 'https://api.groq.com/openai/v1'),
+    "Mistral": ProviderSpec(('MISTRAL_API_KEY',), _openai_compatible_client, _CHAT_OPENAI, 'https://api.mistral.ai/v1'),
+    "Together AI": ProviderSpec(('TOGETHER_API_KEY',), _openai_compatible_client, _CHAT_OPENAI, 'https://api.together.xyz/v1'),
+    "OpenRouter": ProviderSpec(('OPENROUTER_API_KEY',), _openai_compatible_client, _CHAT_OPENAI, 'https://openrouter.ai/api/v1'),
+    "Perplexity": ProviderSpec(('PERPLEXITY_API_KEY', 'PPLX_API_KEY'), _openai_compatible_client, _CHAT_OPENAI, 'https://api.perplexity.ai'),
+    "Fireworks AI": ProviderSpec(('FIREWORKS_API_KEY',), _openai_compatible_client, _CHAT_OPENAI, 'https://api.fireworks.ai/inference/v1'),
+    "xAI (Grok)": ProviderSpec(('XAI_API_KEY',), _openai_compatible_client, _CHAT_OPENAI, 'https://api.x.ai/v1'),
+    "DeepSeek": ProviderSpec(('DEEPSEEK_API_KEY',), _openai_compatible_client, _CHAT_OPENAI, 'https://api.deepseek.com'),
+    "Custom API": ProviderSpec(('CUSTOM_API_KEY',), _openai_compatible_client, _CHAT_OPENAI),
+}
+# Interned keys let lookups with an interned provider (see load_config) match on identity
+_PROVIDERS = {sys.intern(name): spec for name, spec in _PROVIDERS.items()}
+
+# Set once the SDK prewarm thread has been started; it runs at most once per process
+_sdk_prewarm_started = threading.Event()
+_sdk_prewarm_lock = threading.Lock()
+
+def _start_sdk_prewarm(config_file: str):
+    """Import the configured provider's SDK off the caller's thread; langchain imports take seconds"""
+    with _sdk_prewarm_lock:
+        if _sdk_prewarm_started.is_set():
+            return
+        _sdk_prewarm_started.set()
+    threading.Thread(target=_prewarm_sdk, args=(config_file,), name="LLMSDKPrewarm", daemon=True).start()
+
+def _prewarm_sdk(config_file: str):
+    """Import the client class for the provider named in config_file, if there is one"""
+    try:
+        with open(config_file, 'rb') as f:
+            provider = _loads_config(f.read()).get('provider')
+        _PROVIDERS.get(provider, _PROVIDERS["Custom API"]).client_class()
+    except Exception as e:
+        # Missing file or package: get_llm_client reports it when the client is actually needed
+        logger.debug(f"LLM SDK prewarm skipped: {e}")
+
 class LLMConfigManager:
     """Manages LLM configuration for VedOps agents"""
     
+    # Config directories already created in this process; shared by every instance
+    _ensured_dirs = set()
+    # Built clients keyed by config and API key hash. Shared by every instance, since the app
+    # creates a manager per request, so their HTTP connection pools are reused across requests
+    _client_cache: Dict[str, Any] = {}
+    _client_lock = threading.Lock()
+    # Client cache key -> (test passed, expires_at)
+    _connection_results: Dict[str, Tuple[bool, float]] = {}
+    
     def __init__(self, config_file: str = "config/llm_config.json"):
         self.config_file = config_file
+        # ((st_mtime_ns, st_size), config) of the file as last loaded or saved; any write
+        # to the file changes the key
+        self._cached: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None
         self.ensure_config_dir()
+        _start_sdk_prewarm(config_file)
     
     def ensure_config_dir(self):
-        """Ensure config directory exists"""
-        os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
+        """Ensure config directory exists, once per directory per process"""
+        config_dir = os.path.dirname(self.config_file)
+        if config_dir and config_dir not in LLMConfigManager._ensured_dirs:
+            os.makedirs(config_dir, exist_ok=True)
+            LLMConfigManager._ensured_dirs.add(config_dir)
     
     def save_config(self, config: Dict[str, Any]) -> bool:
         """Save LLM configuration to file"""
@@ -29,9 +206,36 @@ class LLMConfigManager:
             config['saved_at'] = datetime.now().isoformat()
             config['version'] = "1.0"
             
-            # Save to file
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            # Save to file: one write to a temp file, then an atomic rename, so readers
+            # never see a half-written config
+            data = memoryview(_dumps_config(config))
+            # A unique temp file per save, so concurrent saves never write into the same one
+            fd, tmp_file = tempfile.mkstemp(
+                dir=os.path.dirname(self.config_file) or ".",
+                prefix=f".{os.path.basename(self.config_file)}.", suffix=".tmp"
+            )
+            try:
+                try:
+                    while data:
+                        data = data[os.write(fd, data):]
+                    # mkstemp creates the file owner-only; keep the permissions of the file being replaced
+                    try:
+                        mode = os.stat(self.config_file).st_mode & 0o777
+                    except FileNotFoundError:
+                        mode = 0o644
+                    os.fchmod(fd, mode)
+                    os.fsync(fd)
+                    # What we just wrote is already validated, so the next load needn't parse it
+                    st = os.fstat(fd)
+                finally:
+                    os.close(fd)
+                os.replace(tmp_file, self.config_file)
+            except BaseException:
+                os.unlink(tmp_file)
+                raise
+            self._cached = ((st.st_mtime_ns, st.st_size), dict(config))
+            # Clients built from the previous config would otherwise linger until restart
+            self.invalidate_clients()
             
             logger.info(f"LLM configuration saved to {self.config_file}")
             return True
@@ -43,20 +247,30 @@ class LLMConfigManager:
     def load_config(self) -> Optional[Dict[str, Any]]:
         """Load LLM configuration from file"""
         try:
-            if not os.path.exists(self.config_file):
+            try:
+                st = os.stat(self.config_file)
+            except FileNotFoundError:
                 logger.warning(f"Configuration file {self.config_file} not found")
                 return None
             
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
+            key = (st.st_mtime_ns, st.st_size)
+            if self._cached and self._cached[0] == key:
+                return dict(self._cached[1])
+            
+            with open(self.config_file, 'rb') as f:
+                config = _loads_config(f.read())
             
             # Validate loaded configuration
             if not self.validate_config(config):
                 logger.error("Loaded configuration is invalid")
                 return None
             
+            if isinstance(config['provider'], str):
+                config['provider'] = sys.intern(config['provider'])
+            
+            self._cached = (key, config)
             logger.info("LLM configuration loaded successfully")
-            return config
+            return dict(config)
             
         except Exception as e:
             logger.error(f"Failed to load LLM configuration: {e}")
@@ -64,17 +278,16 @@ class LLMConfigManager:
     
     def validate_config(self, config: Dict[str, Any]) -> bool:
         """Validate LLM configuration (no API key persisted)"""
-        required_fields = ['provider', 'model']
-        for field in required_fields:
-            if field not in config:
-                logger.error(f"Missing required field: {field}")
-                return False
-
-        # Provider-specific validation
-        provider = config['provider']
+        provider = config.get('provider')
+        if provider is None:
+            logger.error("Missing required field: provider")
+            return False
+        if 'model' not in config:
+            logger.error("Missing required field: model")
+            return False
 
-        # For Azure/Custom, endpoint is required
-        if provider in {'Azure OpenAI', 'Custom API'} and not config.get('endpoint'):
+        # Provider-specific validation: for Azure/Custom, endpoint is required
+        if provider in _ENDPOINT_REQUIRED and not config.get('endpoint'):
             logger.error(f"{provider} requires an endpoint")
             return False
 
@@ -82,6 +295,10 @@ class LLMConfigManager:
     
     def get_llm_client(self, config: Optional[Dict[str, Any]] = None):
         """Get configured LLM client"""
+        return self._resolve_client(config)[1]
+    
+    def _resolve_client(self, config: Optional[Dict[str, Any]]) -> Tuple[str, Any]:
+        """Return (client cache key, client) for config, building the client on first use"""
         if not config:
             config = self.load_config()
         
@@ -91,135 +308,19 @@ class LLMConfigManager:
         provider = config['provider']
         
         try:
-            # Resolve API key from config or environment (we avoid persisting secrets)
-            def resolve_api_key(*env_names: str) -> Optional[str]:
-                for name in env_names:
-                    if name in os.environ and os.environ[name]:
-                        return os.environ[name]
-                return config.get('api_key')  # fallback if passed programmatically
-
-            if provider == "OpenAI":
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('OPENAI_API_KEY'),
-                    temperature=0.1
-                )
-            
-            elif provider == "Anthropic":
-                from langchain_anthropic import ChatAnthropic
-                return ChatAnthropic(
-                    model=config['model'],
-                    api_key=resolve_api_key('ANTHROPIC_API_KEY'),
-                    temperature=0.1
-                )
+            spec = _PROVIDERS.get(provider, _PROVIDERS["Custom API"])
+            api_key = _resolve_api_key(config, spec.env_names)
             
-            elif provider == "Google":
-                from langchain_google_genai import ChatGoogleGenerativeAI
-                return ChatGoogleGenerativeAI(
-                    model=config['model'],
-                    google_api_key=resolve_api_key('GOOGLE_API_KEY'),
-                    temperature=0.1
-                )
+            key = self._client_key(config, api_key)
+            client = self._client_cache.get(key)
+            if client is not None:
+                return key, client
             
-            elif provider == "Ollama (Local)":
-                from langchain_community.llms import Ollama
-                return Ollama(
-                    model=config['model'],
-                    base_url=config.get('ollama_url', 'http://localhost:11434')
-                )
-            
-            elif provider == "Azure OpenAI":
-                from langchain_openai import AzureChatOpenAI
-                return AzureChatOpenAI(
-                    deployment_name=config['model'],
-                    api_key=resolve_api_key('AZURE_OPENAI_API_KEY', 'AZURE_API_KEY'),
-                    azure_endpoint=config['endpoint'],
-                    api_version="2024-02-15-preview",
-                    temperature=0.1
-                )
-
-            # OpenAI-compatible providers via base_url
-            elif provider == "Groq":
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('GROQ_API_KEY'),
-                    base_url=config.get('endpoint', 'https://api.groq.com/openai/v1'),
-                    temperature=0.1
-                )
-
-            elif provider == "Mistral":
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('MISTRAL_API_KEY'),
-                    base_url=config.get('endpoint', 'https://api.mistral.ai/v1'),
-                    temperature=0.1
-                )
-
-            elif provider == "Together AI":
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('TOGETHER_API_KEY'),
-                    base_url=config.get('endpoint', 'https://api.together.xyz/v1'),
-                    temperature=0.1
-                )
-
-            elif provider == "OpenRouter":
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('OPENROUTER_API_KEY'),
-                    base_url=config.get('endpoint', 'https://openrouter.ai/api/v1'),
-                    temperature=0.1
-                )
-
-            elif provider == "Perplexity":
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('PERPLEXITY_API_KEY', 'PPLX_API_KEY'),
-                    base_url=config.get('endpoint', 'https://api.perplexity.ai'),
-                    temperature=0.1
-                )
-
-            elif provider == "Fireworks AI":
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('FIREWORKS_API_KEY'),
-                    base_url=config.get('endpoint', 'https://api.fireworks.ai/inference/v1'),
-                    temperature=0.1
-                )
-
-            elif provider == "xAI (Grok)":
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('XAI_API_KEY'),
-                    base_url=config.get('endpoint', 'https://api.x.ai/v1'),
-                    temperature=0.1
-                )
-
-            elif provider == "DeepSeek":
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('DEEPSEEK_API_KEY'),
-                    base_url=config.get('endpoint', 'https://api.deepseek.com'),
-                    temperature=0.1
-                )
-            
-            else:  # Custom API (OpenAI-compatible)
-                from langchain_openai import ChatOpenAI
-                return ChatOpenAI(
-                    model=config['model'],
-                    api_key=resolve_api_key('CUSTOM_API_KEY'),
-                    base_url=config['endpoint'],
-                    temperature=0.1
-                )
+            with self._client_lock:
+                client = self._client_cache.get(key)
+                if client is None:
+                    client = self._client_cache[key] = spec.factory(config, api_key, spec)
+            return key, client
         
         except ImportError as e:
             logger.error(f"Required package not installed for {provider}: {e}")
@@ -228,21 +329,86 @@ class LLMConfigManager:
             logger.error(f"Failed to initialize {provider} client: {e}")
             raise
     
+    @staticmethod
+    def _client_key(config: Dict[str, Any], api_key: Optional[str]) -> str:
+        """Hash the client-relevant config fields and resolved API key into a cache key"""
+        fields = {k: v for k, v in config.items() if k != 'api_key' and k not in _METADATA_FIELDS}
+        digest = hashlib.blake2b(json.dumps(fields, sort_keys=True, default=str).encode(), digest_size=16)
+        digest.update(hashlib.blake2b((api_key or '').encode(), digest_size=16).digest())
+        return digest.hexdigest()
+    
+    def invalidate_clients(self):
+        """Drop cached LLM clients so the next get_llm_client builds fresh ones"""
+        with LLMConfigManager._client_lock:
+            LLMConfigManager._client_cache.clear()
+            LLMConfigManager._connection_results.clear()
+    
     def test_connection(self, config: Optional[Dict[str, Any]] = None) -> bool:
-        """Test LLM connection"""
+        """Test LLM connection, waiting at most CONNECTION_TEST_TIMEOUT seconds for the reply
+        
+        The client is built on the calling thread; only the request runs on the
+        shared connection test loop, so this works the same whether or not the
+        caller is inside an event loop.
+        """
         try:
-            client = self.get_llm_client(config)
-            
-            # Simple test query
-            response = client.invoke("Hello, this is a connection test.")
-            
-            if response and hasattr(response, 'content'):
-                logger.info("LLM connection test successful")
-                return True
-            else:
-                logger.error("LLM connection test failed - no response")
-                return False
-                
+            key, client = self._resolve_client(config)
+        except Exception as e:
+            logger.error(f"LLM connection test failed: {e}")
+            return False
+        
+        future = asyncio.run_coroutine_threadsafe(
+            self._probe_client(key, client, CONNECTION_TEST_TIMEOUT), _connection_test_loop()
+        )
+        try:
+            # _probe_client bounds the request itself; the margin only covers scheduling
+            return future.result(timeout=CONNECTION_TEST_TIMEOUT + 1)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logger.error(f"LLM connection test timed out after {CONNECTION_TEST_TIMEOUT}s")
+            return False
+    
+    async def test_connection_async(self, config: Optional[Dict[str, Any]] = None,
+                                    timeout: float = CONNECTION_TEST_TIMEOUT) -> bool:
+        """Test LLM connection without blocking the event loop
+        
+        The outcome is reused for CONNECTION_TEST_TTL seconds per client, so
+        repeated checks of an unchanged config make no network call. Clients are
+        cached across calls, so await this from one long-lived loop; test_connection
+        uses the shared connection test loop.
+        """
+        try:
+            # Building a client may import its SDK, which takes seconds; keep that off the loop
+            key, client = await asyncio.get_running_loop().run_in_executor(None, self._resolve_client, config)
+        except Exception as e:
+            logger.error(f"LLM connection test failed: {e}")
+            return False
+        
+        return await self._probe_client(key, client, timeout)
+    
+    async def _probe_client(self, key: str, client: Any, timeout: float) -> bool:
+        """Send the test prompt to a built client, reusing a recent outcome for it"""
+        cached = self._connection_results.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        
+        try:
+            response = await asyncio.wait_for(client.ainvoke(CONNECTION_TEST_PROMPT), timeout=timeout)
+            return self._record_connection_result(key, response)
+        
+        except asyncio.TimeoutError:
+            logger.error(f"LLM connection test timed out after {timeout}s")
+            return False
         except Exception as e:
             logger.error(f"LLM connection test failed: {e}")
             return False
+    
+    def _record_connection_result(self, key: str, response: Any) -> bool:
+        """Judge a test response, log it and remember the outcome for this client"""
+        passed = bool(response) and hasattr(response, 'content')
+        if passed:
+            logger.info("LLM connection test successful")
+        else:
+            logger.error("LLM connection test failed - no response")
+        
+        self._connection_results[key] = (passed, time.monotonic() + CONNECTION_TEST_TTL)
+        return passed
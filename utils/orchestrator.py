@@ -23,7 +23,8 @@ class VedOpsOrchestrator:
         self.llm_config = llm_config
         self.pipeline_config = pipeline_config
         self.db = DatabaseManager()
-        self.db_optimizer = DatabaseOptimizer(self.db.db_path)
+        # Shared per database: each optimizer holds a writer thread and a connection pool
+        self.db_optimizer = DatabaseOptimizer.shared(self.db.db_path)
         self.llm_config_manager = LLMConfigManager()
         self.current_run_id = None
         self.agents = {}
@@ -248,19 +249,16 @@ class VedOpsOrchestrator:
                 
                 self.db.update_agent_execution(execution_id, 'completed', result)
                 
-                if 'security_findings' in result:
-                    for finding in result['security_findings']:
-                        self.db.add_security_finding(
-                            self.current_run_id, finding, execution_id
-                        )
+                # One transaction per kind of row rather than one per finding or metric
+                if result.get('security_findings'):
+                    self.db.add_security_findings_bulk(
+                        self.current_run_id, list(result['security_findings']), execution_id
+                    )
                 
-                if 'performance_metrics' in result:
-                    for metric in result['performance_metrics']:
-                        self.db.add_performance_metric(
-                            pipeline_run_id=self.current_run_id,
-                            agent_execution_id=execution_id,
-                            **metric
-                        )
+                if result.get('performance_metrics'):
+                    self.db.add_performance_metrics_bulk(
+                        self.current_run_id, list(result['performance_metrics']), execution_id
+                    )
                 
                 if 'artifacts' in result:
                     for artifact in result['artifacts']: